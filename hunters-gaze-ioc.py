@@ -1,15 +1,44 @@
-from flask import Flask, render_template_string, jsonify
+from flask import Flask, render_template_string, jsonify, request, Response, stream_with_context
 import requests
+import requests.adapters
 import pandas as pd
+import numpy as np
 from datetime import datetime, timezone, timedelta
 import csv
+import gzip
+import hashlib
 import io
 import concurrent.futures
+import asyncio
 import json
+import mmap
+import os
 import re
 import uuid
 import random
-from collections import Counter
+import socket
+import sqlite3
+import struct
+import sys
+import bisect
+from contextlib import contextmanager
+from array import array
+import threading
+import time
+import traceback
+from collections import Counter, OrderedDict, deque, namedtuple
+from itertools import accumulate, islice
+from urllib.parse import urlsplit
+
+# Optional: Brotli responses and MessagePack output when installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 # --- CONFIGURATION ---
 app = Flask(__name__)
@@ -19,6 +48,77 @@ HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
 
+# Shared keep-alive session: one connection pool per upstream host, so
+# repeated refreshes of lists.blocklist.de / abuse.ch reuse warm TLS connections
+POOL_HOSTS = 32         # Host pools kept alive (~25 distinct feed hosts)
+POOL_MAXSIZE = 10       # Connections kept per host, matches the fetch workers
+
+def build_session():
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = requests.adapters.HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+SESSION = build_session()
+
+# Feed declarations applied on top of the built-in registry at startup, if present
+FEEDS_FILE = os.environ.get('HUNTERS_GAZE_FEEDS', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'feeds.json'))
+
+# SQLite file keeping every feed's last good result and per-IOC history across
+# restarts; set HUNTERS_GAZE_STORE to an empty value to run without one
+STORE_PATH = os.environ.get('HUNTERS_GAZE_STORE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hunters-gaze.db'))
+
+# Directory shared by worker processes: each snapshot's IOC sets are written there
+# as memory-mapped segment files that lookups read; empty keeps lookups in memory
+DATA_DIR = os.environ.get('HUNTERS_GAZE_DATA_DIR', '')
+
+# Process role: "standalone" fetches and serves in one process; in production one
+# "fetcher" (or --fetcher) owns the refresh schedule and publishes to DATA_DIR,
+# and any number of "web" worker processes serve what it published
+ROLE = 'fetcher' if '--fetcher' in sys.argv else os.environ.get('HUNTERS_GAZE_ROLE', 'standalone')
+FOLLOW_INTERVAL = 0.5   # Seconds between a web worker's checks for a newer published snapshot
+if ROLE not in ('standalone', 'fetcher', 'web'):
+    raise SystemExit(f"Unknown HUNTERS_GAZE_ROLE {ROLE!r} (standalone, fetcher or web)")
+if ROLE != 'standalone' and not DATA_DIR:
+    raise SystemExit(f"The {ROLE} role needs HUNTERS_GAZE_DATA_DIR shared with the other processes")
+
+# Full-feed mode ingests every line of every feed into the compact IOC store;
+# /api/data still only carries the first page of rows per feed
+FULL_INGEST = os.environ.get('HUNTERS_GAZE_FULL_INGEST') == '1'
+MAX_FEEDS = 64          # Enabled feeds at most; the correlation index keeps source sets as 64-bit masks
+BULK_LIMIT = 250000     # Max IOCs accepted per POST /api/ioc/bulk
+PAGE_SIZE = 100         # Default rows per /api/iocs page
+PAGE_LIMIT = 5000       # Max rows per /api/iocs page (exports ask for this many)
+SEARCH_CHUNK = 1 << 20  # Bytes of indexed text a one- or two-character search scans at a time
+RECENT_SNAPSHOTS = 4    # Snapshots kept so /api/iocs cursors survive a publish
+DELTA_HISTORY = 32      # Published versions /api/data?since= can still diff against
+STREAM_KEEPALIVE = 15   # Seconds between SSE keep-alive comments on an idle /api/stream
+# Open /api/stream connections per process (0: unlimited). Each holds a worker
+# thread under threaded servers, so keep it below the thread count there
+STREAM_LIMIT = int(os.environ.get('HUNTERS_GAZE_STREAM_LIMIT', 8))
+DRAIN_LIMIT = 256 * 1024    # Unread bytes of a truncated feed still read so its keep-alive connection is reused
+STREAM_CHUNK = 64 * 1024    # Bytes read per socket call when streaming a feed line by line (requests defaults to 512)
+
+# Fetch engine: "threads" runs feeds through a 10-worker pool; "async" runs every
+# feed at once under a per-host limit and publishes whatever finished by the deadline
+FETCH_ENGINE = os.environ.get('HUNTERS_GAZE_ENGINE', 'threads')
+PER_HOST_LIMIT = 4      # Concurrent fetches per upstream host (async engine)
+REFRESH_DEADLINE = 8    # Seconds before the async engine publishes partial results
+CYCLE_RETRY = 30        # Seconds before feeds whose refresh cycle raised are tried again
+
+# Stale-while-revalidate: requests are answered from the last good data at once;
+# a feed whose upstream has not confirmed its rows for this many refresh intervals
+# is flagged stale, and the flip is published like any other change
+STALE_AFTER = 2
+
+# Circuit breaker: a feed that keeps failing is left alone for a cooldown that
+# doubles on every failed probe, so dead sources stop costing a timeout per cycle
+BREAKER_THRESHOLD = 3   # Consecutive failed fetches that open the circuit
+BREAKER_COOLDOWN = 60   # Seconds before the first half-open probe
+BREAKER_MAX_COOLDOWN = 6 * 3600
+
 # --- HTML TEMPLATE (Using Raw String r"" to fix SyntaxWarning) ---
 HTML_TEMPLATE = r"""
 <!DOCTYPE html>
@@ -250,9 +350,9 @@ HTML_TEMPLATE = r"""
                     <span :class="isSimulation ? 'sim-dot' : (isPaused ? 'paused-dot' : 'live-dot')"></span> 
                     <span x-text="statusText">INITIALIZING...</span>
                     <span class="text-slate-600">|</span>
-                    <span x-text="unified.length + ' ACTIVE IOCS'" class="text-blue-400"></span>
+                    <span x-text="summary.total + ' ACTIVE IOCS'" class="text-blue-400"></span>
                     <span class="text-slate-600">|</span>
-                    <span class="text-slate-500">40 SOURCES ACTIVE</span>
+                    <span :class="staleFeeds().length ? 'text-amber-400 cursor-help' : 'text-emerald-400'" :title="staleTitle()" x-text="freshnessText()">SOURCES</span>
                 </div>
             </div>
         </div>
@@ -271,6 +371,9 @@ HTML_TEMPLATE = r"""
             <div @click="activeTab = 'vulns'" :class="{'active': activeTab === 'vulns'}" class="nav-item">
                 <i class="fas fa-shield-halved"></i> Vulns
             </div>
+            <div @click="activeTab = 'health'" :class="{'active': activeTab === 'health'}" class="nav-item">
+                <i class="fas fa-heart-pulse"></i> Health
+            </div>
         </div>
 
         <!-- Controls -->
@@ -291,7 +394,7 @@ HTML_TEMPLATE = r"""
                 <i class="fas" :class="isPaused ? 'fa-play' : 'fa-pause'"></i>
             </button>
 
-            <button @click="fetchData()" class="bg-blue-600 hover:bg-blue-500 text-white px-4 py-2 rounded-lg transition-all text-xs shadow-lg shadow-blue-500/25 font-semibold flex items-center gap-2">
+            <button @click="fetchData(true)" class="bg-blue-600 hover:bg-blue-500 text-white px-4 py-2 rounded-lg transition-all text-xs shadow-lg shadow-blue-500/25 font-semibold flex items-center gap-2">
                 <i class="fas fa-sync-alt" :class="{'animate-spin': isLoading}"></i>
                 <span class="hidden sm:inline">SYNC</span>
             </button>
@@ -410,7 +513,7 @@ HTML_TEMPLATE = r"""
                     <div class="overflow-auto flex-1 custom-scroll p-2">
                         <table class="w-full text-left border-collapse">
                             <tbody>
-                                <template x-for="item in filteredUnified.slice(0, 10)" :key="item.id">
+                                <template x-for="item in page.slice(0, 10)" :key="item.id">
                                     <tr class="group border-b border-slate-800/50 hover:bg-white/5 transition-colors rounded-lg cursor-pointer" @click="investigate(item.ioc)">
                                         <td class="w-12 text-center"><i :class="item.icon + ' ' + item.colorClass" class="text-lg opacity-80"></i></td>
                                         <td>
@@ -452,7 +555,7 @@ HTML_TEMPLATE = r"""
                         <i class="fas fa-satellite-dish text-blue-400"></i> OMNI-INTEL FEED
                     </h2>
                     <select x-model="selectedSource" class="custom-select w-full sm:w-48">
-                        <option value="all">All Sources (40)</option>
+                        <option value="all" x-text="'All Sources (' + allSources.length + ')'">All Sources</option>
                         <template x-for="source in allSources" :key="source">
                             <option :value="source" x-text="source"></option>
                         </template>
@@ -483,7 +586,7 @@ HTML_TEMPLATE = r"""
                         </tr>
                     </thead>
                     <tbody class="divide-y divide-slate-800/50">
-                        <template x-for="item in filteredUnified" :key="item.id">
+                        <template x-for="item in page" :key="item.id">
                             <tr class="transition group hover:bg-slate-800/40">
                                 <td>
                                     <span class="badge" :class="item.badgeClass">
@@ -524,7 +627,7 @@ HTML_TEMPLATE = r"""
                                 </td>
                             </tr>
                         </template>
-                        <tr x-show="filteredUnified.length === 0">
+                        <tr x-show="page.length === 0 && !pageLoading">
                             <td colspan="6" class="p-12 text-center text-slate-500">
                                 <div class="flex flex-col items-center gap-2">
                                     <i class="fas fa-filter text-3xl opacity-50"></i>
@@ -535,6 +638,17 @@ HTML_TEMPLATE = r"""
                     </tbody>
                 </table>
             </div>
+            <div class="p-3 border-t border-white/5 bg-slate-800/40 flex justify-between items-center text-[10px] text-slate-400">
+                <span x-text="pageRange()"></span>
+                <div class="flex gap-2">
+                    <button @click="prevPage()" :disabled="cursorStack.length === 0" class="bg-slate-900 border border-slate-700 px-2 py-1 rounded hover:border-slate-500 disabled:opacity-40">
+                        <i class="fas fa-chevron-left mr-1"></i> Prev
+                    </button>
+                    <button @click="nextPage()" :disabled="!nextCursor" class="bg-slate-900 border border-slate-700 px-2 py-1 rounded hover:border-slate-500 disabled:opacity-40">
+                        Next <i class="fas fa-chevron-right ml-1"></i>
+                    </button>
+                </div>
+            </div>
         </div>
 
         <!-- NETWORK & MAP VIEW -->
@@ -556,7 +670,7 @@ HTML_TEMPLATE = r"""
                     <table class="w-full text-left">
                         <thead class="bg-slate-900/50"><tr><th class="py-2">IP Addr</th><th class="py-2">Cty</th><th class="py-2 text-right">Reports</th></tr></thead>
                         <tbody>
-                            <template x-for="item in data.sans">
+                            <template x-for="item in data.sans || []">
                                 <tr class="border-b border-slate-800/50 hover:bg-slate-800/30 cursor-pointer" @click="investigate(item.ip)">
                                     <td class="font-mono text-red-300 text-xs p-3" x-text="item.ip"></td>
                                     <td class="text-slate-400 text-xs p-3" x-text="item.country"></td>
@@ -581,13 +695,13 @@ HTML_TEMPLATE = r"""
                     <p class="text-xs text-orange-200/50 mt-1">Known Exploited Vulnerabilities Catalog (US-CERT)</p>
                 </div>
                 <div class="text-right">
-                    <div class="text-2xl font-bold text-white" x-text="data.cisa.length">0</div>
+                    <div class="text-2xl font-bold text-white" x-text="(data.cisa || []).length">0</div>
                     <div class="text-[10px] text-slate-400 uppercase tracking-wider">Active CVEs</div>
                 </div>
             </div>
             <div class="overflow-auto flex-1 p-0 custom-scroll">
                 <div class="grid grid-cols-1 gap-1 p-1">
-                    <template x-for="item in data.cisa">
+                    <template x-for="item in data.cisa || []">
                         <div class="bg-slate-800/30 border border-slate-700/50 p-4 rounded-lg hover:bg-slate-800/60 hover:border-orange-500/30 transition-all group">
                             <div class="flex justify-between items-start mb-2">
                                 <div class="flex gap-3 items-center">
@@ -609,6 +723,48 @@ HTML_TEMPLATE = r"""
             </div>
         </div>
 
+        <!-- FEED HEALTH VIEW -->
+        <div x-show="activeTab === 'health'" class="glass-panel flex flex-col h-[750px] animate-fade-in">
+            <div class="p-4 border-b border-white/5 bg-slate-800/40 flex justify-between items-center">
+                <h2 class="font-bold text-sm text-white flex items-center gap-2">
+                    <i class="fas fa-heart-pulse text-emerald-400"></i> FEED HEALTH
+                </h2>
+                <a href="/metrics" target="_blank" class="text-[10px] text-slate-400 hover:text-white bg-slate-900 border border-slate-700 px-2 py-1 rounded">Prometheus /metrics</a>
+            </div>
+            <div class="overflow-auto flex-1 p-0 custom-scroll">
+                <table class="w-full text-left border-collapse">
+                    <thead>
+                        <tr>
+                            <th>Feed</th>
+                            <th>Status</th>
+                            <th class="text-right">Latency</th>
+                            <th class="text-right hidden md:table-cell">Parse</th>
+                            <th class="text-right">IOCs</th>
+                            <th class="text-right hidden md:table-cell">Bytes</th>
+                            <th>Last Success</th>
+                            <th>Data Age</th>
+                            <th class="hidden md:table-cell">Last Error</th>
+                        </tr>
+                    </thead>
+                    <tbody class="divide-y divide-slate-800/50 text-xs">
+                        <template x-for="[key, feed] in Object.entries(health)" :key="key">
+                            <tr class="hover:bg-slate-800/40">
+                                <td class="text-slate-300" x-text="feed.source"></td>
+                                <td><span class="text-[10px] px-1.5 py-0.5 rounded border" :class="healthClass(feed)" x-text="(feed.outcome || 'pending') + (feed.circuit === 'open' ? ' · circuit open, retry ' + feed.retry_in + 's' : '')"></span></td>
+                                <td class="text-right font-mono" x-text="feed.latency === null || feed.latency === undefined ? '-' : Math.round(feed.latency * 1000) + ' ms'"></td>
+                                <td class="text-right font-mono hidden md:table-cell" x-text="feed.parse_seconds === null || feed.parse_seconds === undefined ? '-' : Math.round(feed.parse_seconds * 1000) + ' ms'"></td>
+                                <td class="text-right font-mono" x-text="feed.iocs || 0"></td>
+                                <td class="text-right font-mono hidden md:table-cell" x-text="feed.bytes || 0"></td>
+                                <td class="text-slate-400" x-text="feed.last_success ? timeAgo(feed.last_success * 1000) : 'never'"></td>
+                                <td :class="feed.stale ? 'text-amber-400' : 'text-slate-400'" x-text="(feed.fetched_at ? timeAgo(feed.fetched_at) : 'no data') + (feed.stale ? ' (stale)' : '')"></td>
+                                <td class="text-red-400 hidden md:table-cell" x-text="feed.error || ''"></td>
+                            </tr>
+                        </template>
+                    </tbody>
+                </table>
+            </div>
+        </div>
+
     </main>
 
     <script>
@@ -620,49 +776,56 @@ HTML_TEMPLATE = r"""
                 isLoading: false,
                 isPaused: false,
                 isSimulation: false,
+                isStreaming: false,
+                clock: Date.now(),
+                health: {},
                 statusText: 'CONNECTING',
                 searchQuery: '',
                 toasts: [],
                 investigateItem: null,
-                data: { sans: [], urlhaus: [], threatfox: [], feodo: [], bazaar: [], cisa: [], osint: [], openphish: [], tor: [], blocklist: [], botvrij: [], greensnow: [], vxvault: [], phishdb: [], coinblocker: [], et: [], sslbl: [], binary: [], cins: [], spamhaus: [], bambenek: [], stopforum: [], darklist: [], proxies: [], cybercrime: [], urlvir: [], phishstats: [], mdl: [], dga: [], apache: [], mail: [], ftp: [], imap: [], sip: [], bots: [], cleanmx: [], cybercure: [], rutgers: [], nipr: [], uce: [] },
-                unified: [],
+                data: {},
                 allSources: [],
+                summary: { total: 0, correlated: 0, sources: [], radar: {} },
+                // Only the current page of the unified view lives in the browser
+                page: [],
+                pageSize: 100,
+                pageTotal: null,
+                pageCursor: null,
+                nextCursor: null,
+                cursorStack: [],
+                pageLoading: false,
+                queryTimer: null,
                 metrics: [
-                    { label: 'Correlated Threats', value: 0, icon: 'fas fa-link', color: 'text-red-500', bg: 'bg-red-600', filterKey: 'correlated' },
-                    { label: 'Network Scan', value: 0, icon: 'fas fa-network-wired', color: 'text-red-400', bg: 'bg-red-500', filterKey: 'network' },
-                    { label: 'Botnet IOCs', value: 0, icon: 'fas fa-robot', color: 'text-yellow-400', bg: 'bg-yellow-500', filterKey: 'botnet' },
-                    { label: 'Malware URLs', value: 0, icon: 'fas fa-bug', color: 'text-purple-400', bg: 'bg-purple-500', filterKey: 'malware' },
-                    { label: 'Phishing', value: 0, icon: 'fas fa-fish', color: 'text-pink-400', bg: 'bg-pink-500', filterKey: 'phishing' },
-                    { label: 'Hashes', value: 0, icon: 'fas fa-file-code', color: 'text-green-400', bg: 'bg-green-500', filterKey: 'malware' },
-                    { label: 'CVEs', value: 0, icon: 'fas fa-shield-virus', color: 'text-orange-400', bg: 'bg-orange-500', filterKey: 'all' },
-                    { label: 'OSINT', value: 0, icon: 'fas fa-eye', color: 'text-indigo-400', bg: 'bg-indigo-500', filterKey: 'all' },
-                    { label: 'Anon/Tor', value: 0, icon: 'fas fa-user-secret', color: 'text-slate-400', bg: 'bg-slate-500', filterKey: 'all' },
-                    { label: 'Brute Force', value: 0, icon: 'fas fa-fire', color: 'text-red-500', bg: 'bg-red-600', filterKey: 'network' },
-                    { label: 'Crypto Mining', value: 0, icon: 'fas fa-coins', color: 'text-yellow-300', bg: 'bg-yellow-400', filterKey: 'crypto' }
+                    { key: 'correlated', label: 'Correlated Threats', value: 0, icon: 'fas fa-link', color: 'text-red-500', bg: 'bg-red-600', filterKey: 'correlated' },
+                    { key: 'network', label: 'Network Scan', value: 0, icon: 'fas fa-network-wired', color: 'text-red-400', bg: 'bg-red-500', filterKey: 'network' },
+                    { key: 'botnet', label: 'Botnet IOCs', value: 0, icon: 'fas fa-robot', color: 'text-yellow-400', bg: 'bg-yellow-500', filterKey: 'botnet' },
+                    { key: 'malware', label: 'Malware URLs', value: 0, icon: 'fas fa-bug', color: 'text-purple-400', bg: 'bg-purple-500', filterKey: 'malware' },
+                    { key: 'phishing', label: 'Phishing', value: 0, icon: 'fas fa-fish', color: 'text-pink-400', bg: 'bg-pink-500', filterKey: 'phishing' },
+                    { key: 'hashes', label: 'Hashes', value: 0, icon: 'fas fa-file-code', color: 'text-green-400', bg: 'bg-green-500', filterKey: 'malware' },
+                    { key: 'cves', label: 'CVEs', value: 0, icon: 'fas fa-shield-virus', color: 'text-orange-400', bg: 'bg-orange-500', filterKey: 'all' },
+                    { key: 'osint', label: 'OSINT', value: 0, icon: 'fas fa-eye', color: 'text-indigo-400', bg: 'bg-indigo-500', filterKey: 'all' },
+                    { key: 'anonymizers', label: 'Anon/Tor', value: 0, icon: 'fas fa-user-secret', color: 'text-slate-400', bg: 'bg-slate-500', filterKey: 'all' },
+                    { key: 'bruteforce', label: 'Brute Force', value: 0, icon: 'fas fa-fire', color: 'text-red-500', bg: 'bg-red-600', filterKey: 'network' },
+                    { key: 'crypto', label: 'Crypto Mining', value: 0, icon: 'fas fa-coins', color: 'text-yellow-300', bg: 'bg-yellow-400', filterKey: 'crypto' }
                 ],
 
-                async fetchData() {
+                async fetchData(refresh = false) {
                     if (this.isPaused) return;
                     this.isLoading = true;
                     this.statusText = 'SYNCING INTEL...';
                     
                     try {
-                        const res = await fetch('/api/data');
-                        const json = await res.json();
-                        
-                        this.data = json;
-                        this.isSimulation = json.simulation || false;
-                        
-                        this.processUnified();
-                        this.updateMetrics();
-                        this.renderMap();
-                        this.renderRadar();
-                        
-                        if(this.isSimulation) {
-                            this.statusText = 'SIMULATION MODE (LIVE DATA UNAVAILABLE)';
-                        } else {
-                            this.statusText = 'LIVE | ' + new Date().toLocaleTimeString();
-                        }
+                        // Ask only for what changed since the version already on screen;
+                        // SYNC also asks the server to refresh its feeds first
+                        const params = new URLSearchParams();
+                        if (this.data.version) params.set('since', this.data.version);
+                        if (refresh) params.set('refresh', '1');
+                        const res = await fetch('/api/data' + (params.toString() ? '?' + params : ''));
+                        // The refresh runs in the background; without push, look again shortly
+                        if (refresh && !this.isStreaming) setTimeout(() => this.fetchData(), 5000);
+                        if (res.status !== 304) this.receive(await res.json());
+                        this.isSimulation = this.data.simulation || false;
+                        this.updateStatus();
                         
                     } catch (e) {
                         console.error(e);
@@ -672,11 +835,109 @@ HTML_TEMPLATE = r"""
                     }
                 },
                 
+                receive(json) {
+                    const version = this.data.version;
+                    if (json.delta) this.applyDelta(json);
+                    else this.data = json;
+                    
+                    this.summary = this.data.summary || this.summary;
+                    this.allSources = this.summary.sources;
+                    // Cursors pin their snapshot; a new version restarts the table from its first page
+                    if (this.data.version !== version) this.resetPage();
+                    else this.fetchPage(this.pageCursor);
+                    this.updateMetrics();
+                    this.renderMap();
+                    this.renderRadar();
+                    if (this.activeTab === 'health') this.fetchHealth();
+                },
+                
+                updateStatus() {
+                    if(this.isSimulation) {
+                        this.statusText = 'SIMULATION MODE (LIVE DATA UNAVAILABLE)';
+                    } else {
+                        this.statusText = this.isStreaming ? 'LIVE (PUSH)' : 'LIVE';
+                    }
+                },
+                
+                // Per-feed freshness from the snapshot: when upstream last confirmed each feed.
+                // Snapshots are cached, so staleness is worked out here against the ticking clock
+                staleFeeds() {
+                    return Object.entries(this.data.freshness || {})
+                        .filter(([, f]) => !f.fetched_at || this.clock - new Date(f.fetched_at) > f.stale_after * 1000);
+                },
+                
+                freshnessText() {
+                    const total = Object.keys(this.data.freshness || {}).length;
+                    if (!total) return this.allSources.length + ' SOURCES';
+                    const stale = this.staleFeeds().length;
+                    return (total - stale) + '/' + total + ' FEEDS FRESH' + (stale ? ' | ' + stale + ' STALE' : '');
+                },
+                
+                staleTitle() {
+                    return this.staleFeeds().map(([key, f]) => key + ': ' + (f.fetched_at ? 'last fetched ' + this.timeAgo(f.fetched_at) : 'never fetched')).join('\n');
+                },
+                
+                // Pushed versions arrive in order; a gap (or a reset) falls back to a ?since= fetch
+                connectStream() {
+                    if (!window.EventSource) return;
+                    const stream = new EventSource('/api/stream?since=' + (this.data.version || 0));
+                    stream.onopen = () => { this.isStreaming = true; };
+                    stream.onerror = () => {
+                        this.isStreaming = false;
+                        // A refused stream (server at its stream limit) is not retried by the browser
+                        if (stream.readyState === EventSource.CLOSED) setTimeout(() => this.connectStream(), 60000);
+                    };
+                    stream.addEventListener('delta', (e) => {
+                        if (this.isPaused) return;
+                        const json = JSON.parse(e.data);
+                        if (json.since !== this.data.version) return this.fetchData();
+                        this.receive(json);
+                        this.isSimulation = this.data.simulation || false;
+                        this.updateStatus();
+                    });
+                    stream.addEventListener('reset', () => this.fetchData());
+                },
+                
+                async fetchHealth() {
+                    try {
+                        const res = await fetch('/api/status');
+                        this.health = (await res.json()).feeds;
+                    } catch (e) {
+                        console.error(e);
+                    }
+                },
+                
+                healthClass(feed) {
+                    if (feed.error) return 'text-red-300 border-red-500/40 bg-red-900/20';
+                    if (feed.outcome === 'empty') return 'text-amber-300 border-amber-500/40 bg-amber-900/20';
+                    if (!feed.outcome) return 'text-slate-400 border-slate-600';
+                    return 'text-emerald-300 border-emerald-500/40 bg-emerald-900/20';
+                },
+                
                 toggleSimulation() {
                     this.isSimulation = !this.isSimulation;
                     this.fetchData();
                 },
                 
+                // Feed rows are keyed by their IOC field, like row_ioc() on the server
+                rowIoc(row) {
+                    return row.ip || row.url || row.domain || row.hash || row.cveID || row.sha1 || row.ioc;
+                },
+                
+                applyDelta(json) {
+                    const { delta, since, ...meta } = json;
+                    Object.entries(delta).forEach(([key, change]) => {
+                        if (change.rows) {
+                            this.data[key] = change.rows;
+                            return;
+                        }
+                        const replaced = new Set([...change.removed, ...change.added.map(row => this.rowIoc(row))]);
+                        const kept = (this.data[key] || []).filter(row => !replaced.has(this.rowIoc(row)));
+                        this.data[key] = [...change.added, ...kept];
+                    });
+                    Object.assign(this.data, meta);
+                },
+                
                 setFilter(key) {
                     this.activeFilter = key;
                     this.activeTab = 'unified';
@@ -687,266 +948,61 @@ HTML_TEMPLATE = r"""
                     this.investigateItem = ioc;
                 },
 
-                processUnified() {
-                    let combined = [];
-                    let idCounter = 0;
-                    const seenSources = new Set();
-                    
-                    const add = (source, list, mapFn, category, riskScore) => {
-                        if (!list) return;
-                        seenSources.add(source);
-                        list.forEach(item => combined.push({ 
-                            id: idCounter++, 
-                            source, 
-                            category, 
-                            risk: riskScore,
-                            correlated: item.correlated || false,
-                            ...mapFn(item) 
-                        }));
-                    };
+                queryParams(extra = {}) {
+                    const params = new URLSearchParams({ source: this.selectedSource, q: this.searchQuery, ...extra });
+                    if (this.activeFilter === 'correlated') params.set('correlated', '1');
+                    else params.set('category', this.activeFilter);
+                    return params;
+                },
 
-                    add('SANS ISC', this.data.sans, i => ({
-                        rawTime: i.updated, ioc: i.ip, type: 'Network Scan', details: `${i.reports} Reports (${i.country})`, 
-                        link: `https://isc.sans.edu/ipinfo.html?ip=${i.ip}`, pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-sans', icon: 'fas fa-network-wired', colorClass: 'text-red-400'
-                    }), 'network', 5);
-
-                    add('Feodo Tracker', this.data.feodo, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'Botnet C2', details: `${i.malware} (Port ${i.port})`,
-                        link: `https://feodotracker.abuse.ch/browse/ip/${i.ip}/`, pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-feodo', icon: 'fas fa-robot', colorClass: 'text-yellow-400'
-                    }), 'botnet', 9);
-
-                    add('URLhaus', this.data.urlhaus, i => ({
-                        rawTime: i.date, ioc: i.url, type: 'Malware URL', details: `${i.threat} (${i.status})`,
-                        link: i.link, pivotLink: `https://urlscan.io/search/#"${i.url}"`,
-                        badgeClass: 'src-urlhaus', icon: 'fas fa-link', colorClass: 'text-blue-400'
-                    }), 'malware', 8);
-
-                    add('OpenPhish', this.data.openphish, i => ({
-                        rawTime: i.date, ioc: i.url, type: 'Phishing URL', details: 'Detected Phishing Site',
-                        link: i.url, pivotLink: `https://urlscan.io/search/#"${i.url}"`,
-                        badgeClass: 'src-openphish', icon: 'fas fa-fish', colorClass: 'text-pink-400'
-                    }), 'phishing', 7);
-
-                    add('ThreatFox', this.data.threatfox, i => ({
-                        rawTime: i.date, ioc: i.ioc, type: i.threat_type, details: `${i.malware} (@${i.reporter})`,
-                        link: i.reference, pivotLink: i.ioc.includes('.') ? `https://www.virustotal.com/gui/search/${i.ioc}` : `https://www.abuseipdb.com/check/${i.ioc}`,
-                        badgeClass: 'src-threatfox', icon: 'fas fa-brain', colorClass: 'text-purple-400'
-                    }), 'botnet', 9);
-
-                    add('MalwareBazaar', this.data.bazaar, i => ({
-                        rawTime: i.date, ioc: i.hash, type: i.type, details: `${i.signature}`,
-                        link: i.link, pivotLink: `https://www.virustotal.com/gui/file/${i.hash}`,
-                        badgeClass: 'src-bazaar', icon: 'fas fa-file-code', colorClass: 'text-green-400'
-                    }), 'malware', 8);
-
-                    add('CISA KEV', this.data.cisa.slice(0,10), i => ({
-                        rawTime: i.dateAdded, ioc: i.cveID, type: 'Exploited Vuln', details: i.product,
-                        link: `https://nvd.nist.gov/vuln/detail/${i.cveID}`, pivotLink: `https://cve.mitre.org/cgi-bin/cvename.cgi?name=${i.cveID}`,
-                        badgeClass: 'src-cisa', icon: 'fas fa-shield-virus', colorClass: 'text-orange-400'
-                    }), 'all', 10);
-                    
-                    add('Tor Exit', this.data.tor, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'Anonymizer', details: 'Tor Exit Node',
-                        link: `https://metrics.torproject.org/rs.html#search/${i.ip}`, pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-tor', icon: 'fas fa-user-secret', colorClass: 'text-slate-400'
-                    }), 'all', 3);
-
-                    add('Blocklist.de', this.data.blocklist, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'SSH Brute Force', details: 'Aggressive Scanner',
-                        link: `https://lists.blocklist.de/lists/ssh.txt`, pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-blocklist', icon: 'fas fa-key', colorClass: 'text-red-500'
-                    }), 'network', 6);
-                    
-                    add('DigitalSide', this.data.osint, i => ({
-                        rawTime: new Date().toISOString().split('T')[0], ioc: i.ioc, type: 'OSINT Domain', details: 'Malicious Domain List',
-                        link: '#', pivotLink: `https://urlscan.io/search/#"${i.ioc}"`,
-                        badgeClass: 'src-osint', icon: 'fas fa-eye', colorClass: 'text-indigo-400'
-                    }), 'malware', 5);
-                    
-                    add('Botvrij.eu', this.data.botvrij, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'Open Botnet', details: i.desc,
-                        link: 'https://www.botvrij.eu', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-botvrij', icon: 'fas fa-robot', colorClass: 'text-teal-400'
-                    }), 'botnet', 7);
-                    
-                    add('GreenSnow', this.data.greensnow, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'Mass Brute Force', details: 'Attack Source',
-                        link: 'https://blocklist.greensnow.co/', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-greensnow', icon: 'fas fa-snowflake', colorClass: 'text-lime-400'
-                    }), 'network', 6);
-                    
-                    add('VX Vault', this.data.vxvault, i => ({
-                        rawTime: i.date, ioc: i.url, type: 'Malware URL', details: 'High Conf. Malware',
-                        link: 'http://vxvault.net/URL_List.php', pivotLink: `https://urlscan.io/search/#"${i.url}"`,
-                        badgeClass: 'src-vxvault', icon: 'fas fa-bug', colorClass: 'text-fuchsia-400'
-                    }), 'malware', 9);
-                    
-                    add('Phishing.Database', this.data.phishdb, i => ({
-                        rawTime: i.date, ioc: i.url, type: 'Phishing URL', details: 'Fresh Phish',
-                        link: 'https://github.com/mitchellkrogza/Phishing.Database', pivotLink: `https://urlscan.io/search/#"${i.url}"`,
-                        badgeClass: 'src-phishdb', icon: 'fas fa-fish', colorClass: 'text-rose-400'
-                    }), 'phishing', 8);
-                    
-                    add('CoinBlocker', this.data.coinblocker, i => ({
-                        rawTime: i.date, ioc: i.domain, type: 'Crypto Mining', details: 'Cryptojacking Domain',
-                        link: 'https://zerodot1.gitlab.io/CoinBlockerListsWeb/', pivotLink: `https://urlscan.io/search/#"${i.domain}"`,
-                        badgeClass: 'src-coin', icon: 'fas fa-coins', colorClass: 'text-yellow-300'
-                    }), 'crypto', 4);
-
-                    add('EmergingThreats', this.data.et, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'Compromised Host', details: 'ET Block Rules',
-                        link: 'https://rules.emergingthreats.net', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-et', icon: 'fas fa-skull', colorClass: 'text-pink-400'
-                    }), 'malware', 7);
-                    
-                    add('SSL Blacklist', this.data.sslbl, i => ({
-                        rawTime: i.date, ioc: i.sha1, type: 'Malicious Cert', details: 'Abuse.ch SSLBL',
-                        link: 'https://sslbl.abuse.ch', pivotLink: `https://censys.io/certificates?q=${i.sha1}`,
-                        badgeClass: 'src-sslbl', icon: 'fas fa-lock', colorClass: 'text-teal-300'
-                    }), 'botnet', 8);
-
-                    add('BinaryDefense', this.data.binary, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'Artillery Ban', details: 'Known Attacker',
-                        link: 'https://www.binarydefense.com', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-binary', icon: 'fas fa-shield-alt', colorClass: 'text-indigo-300'
-                    }), 'network', 6);
-
-                    add('CINS Army', this.data.cins, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'Bad Reputation', details: 'Sentinel/CI-BadGuys',
-                        link: 'http://cinsscore.com', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-cins', icon: 'fas fa-fighter-jet', colorClass: 'text-red-300'
-                    }), 'network', 7);
-
-                    add('Spamhaus DROP', this.data.spamhaus, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'Cybercrime Net', details: 'Don\'t Route/Peer',
-                        link: 'https://www.spamhaus.org/drop/', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-spamhaus', icon: 'fas fa-ban', colorClass: 'text-slate-300'
-                    }), 'network', 9);
-
-                    add('Bambenek C2', this.data.bambenek, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'C2 Masterlist', details: 'Known Command & Control',
-                        link: 'http://osint.bambenekconsulting.com/feeds/', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-bambenek', icon: 'fas fa-server', colorClass: 'text-fuchsia-400'
-                    }), 'botnet', 10);
-                    
-                    add('StopForumSpam', this.data.stopforum, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'Toxic IP', details: 'Forum Spammer',
-                        link: 'https://www.stopforumspam.com', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-stopforum', icon: 'fas fa-comment-slash', colorClass: 'text-orange-300'
-                    }), 'network', 5);
-                    
-                    add('Darklist.de', this.data.darklist, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'SSH/HTTP Attack', details: 'Darklist Aggregated',
-                        link: 'https://darklist.de', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-darklist', icon: 'fas fa-spider', colorClass: 'text-slate-400'
-                    }), 'network', 6);
-                    
-                    add('Open Proxies', this.data.proxies, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'Open Proxy', details: 'Socks4/5 Anonymizer',
-                        link: '#', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-proxy', icon: 'fas fa-mask', colorClass: 'text-teal-300'
-                    }), 'all', 4);
-                    
-                    add('CyberCrime-Tracker', this.data.cybercrime, i => ({
-                        rawTime: i.date, ioc: i.url, type: 'C2 Panel', details: 'Botnet Controller',
-                        link: 'https://cybercrime-tracker.net', pivotLink: `https://urlscan.io/search/#"${i.url}"`,
-                        badgeClass: 'src-cybercrime', icon: 'fas fa-network-wired', colorClass: 'text-purple-400'
-                    }), 'botnet', 10);
-                    
-                    add('URLVir', this.data.urlvir, i => ({
-                        rawTime: i.date, ioc: i.url, type: 'Malware Link', details: 'URLVir Feed',
-                        link: 'http://www.urlvir.com/', pivotLink: `https://urlscan.io/search/#"${i.url}"`,
-                        badgeClass: 'src-urlvir', icon: 'fas fa-link', colorClass: 'text-pink-400'
-                    }), 'malware', 7);
-                    
-                    add('PhishStats', this.data.phishstats, i => ({
-                        rawTime: i.date, ioc: i.url, type: 'Phishing', details: i.title,
-                        link: 'https://phishstats.info', pivotLink: `https://urlscan.io/search/#"${i.url}"`,
-                        badgeClass: 'src-phishstats', icon: 'fas fa-fish', colorClass: 'text-rose-400'
-                    }), 'phishing', 8);
-                    
-                    add('MalwareDomainList', this.data.mdl, i => ({
-                        rawTime: i.date, ioc: i.domain, type: 'Malware Domain', details: i.desc,
-                        link: 'http://www.malwaredomainlist.com/mdl.php', pivotLink: `https://urlscan.io/search/#"${i.domain}"`,
-                        badgeClass: 'src-mdl', icon: 'fas fa-skull-crossbones', colorClass: 'text-purple-300'
-                    }), 'malware', 8);
-                    
-                    add('Bambenek DGA', this.data.dga, i => ({
-                        rawTime: i.date, ioc: i.domain, type: 'DGA Domain', details: i.desc,
-                        link: 'http://osint.bambenekconsulting.com/feeds/', pivotLink: `https://urlscan.io/search/#"${i.domain}"`,
-                        badgeClass: 'src-dga', icon: 'fas fa-random', colorClass: 'text-yellow-200'
-                    }), 'botnet', 9);
-                    
-                    add('Blocklist.de Apache', this.data.apache, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'Apache Attack', details: 'Web Exploit',
-                        link: 'https://lists.blocklist.de/lists/apache.txt', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-apache', icon: 'fas fa-server', colorClass: 'text-rose-300'
-                    }), 'network', 7);
-                    
-                    add('Blocklist.de Mail', this.data.mail, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'Mail Server Attack', details: 'Postfix/Exim Brute',
-                        link: 'https://lists.blocklist.de/lists/mail.txt', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-blocklist', icon: 'fas fa-envelope', colorClass: 'text-orange-400'
-                    }), 'network', 6);
-                    
-                    add('Blocklist.de FTP', this.data.ftp, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'FTP Attack', details: 'FTP Brute Force',
-                        link: 'https://lists.blocklist.de/lists/ftp.txt', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-blocklist', icon: 'fas fa-file-upload', colorClass: 'text-amber-400'
-                    }), 'network', 5);
-                    
-                    add('Blocklist.de IMAP', this.data.imap, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'IMAP Attack', details: 'Email Access Brute',
-                        link: 'https://lists.blocklist.de/lists/imap.txt', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-blocklist', icon: 'fas fa-inbox', colorClass: 'text-yellow-500'
-                    }), 'network', 5);
-                    
-                    add('Blocklist.de SIP', this.data.sip, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'SIP Attack', details: 'VoIP Gateway Abuse',
-                        link: 'https://lists.blocklist.de/lists/sip.txt', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-blocklist', icon: 'fas fa-phone-slash', colorClass: 'text-red-400'
-                    }), 'network', 6);
-                    
-                    add('Blocklist.de Bots', this.data.bots, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'RFI/Bot', details: 'Remote File Inclusion',
-                        link: 'https://lists.blocklist.de/lists/bots.txt', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-blocklist', icon: 'fas fa-robot', colorClass: 'text-fuchsia-500'
-                    }), 'botnet', 8);
-                    
-                    add('CleanMX', this.data.cleanmx, i => ({
-                        rawTime: i.date, ioc: i.url, type: 'Virus/Malware', details: 'CleanMX VirusWatch',
-                        link: 'http://lists.clean-mx.com/pipermail/viruswatch/', pivotLink: `https://urlscan.io/search/#"${i.url}"`,
-                        badgeClass: 'src-cleanmx', icon: 'fas fa-virus', colorClass: 'text-teal-400'
-                    }), 'malware', 9);
-                    
-                    add('CyberCure', this.data.cybercure, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'Malicious IP', details: 'CyberCure Intel',
-                        link: 'http://api.cybercure.ai/feed/get_ips', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-cybercure', icon: 'fas fa-biohazard', colorClass: 'text-rose-400'
-                    }), 'network', 7);
-                    
-                    add('Rutgers', this.data.rutgers, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'Bad Actor', details: 'Rutgers Blacklist',
-                        link: 'https://report.cs.rutgers.edu/DROP/attackers', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-rutgers', icon: 'fas fa-university', colorClass: 'text-purple-400'
-                    }), 'network', 6);
-                    
-                    add('NIPR', this.data.nipr, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'DoD Blocklist', details: 'NIPR Intrusion',
-                        link: '#', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-nipr', icon: 'fas fa-shield-alt', colorClass: 'text-blue-400'
-                    }), 'network', 8);
-                    
-                    add('UCEPROTECT', this.data.uce, i => ({
-                        rawTime: i.date, ioc: i.ip, type: 'L1 Spammer', details: 'UCEPROTECT Level 1',
-                        link: 'http://www.uceprotect.net', pivotLink: `https://www.abuseipdb.com/check/${i.ip}`,
-                        badgeClass: 'src-uce', icon: 'fas fa-mail-bulk', colorClass: 'text-yellow-400'
-                    }), 'network', 5);
-
-                    this.allSources = Array.from(seenSources).sort();
-                    this.unified = combined.sort((a, b) => new Date(b.rawTime) - new Date(a.rawTime));
+                async fetchPage(cursor = null) {
+                    const params = this.queryParams({ limit: this.pageSize });
+                    if (cursor) params.set('cursor', cursor);
+                    this.pageLoading = true;
+                    try {
+                        const res = await fetch('/api/iocs?' + params);
+                        // The cursor's snapshot has been dropped: start over on the current one
+                        if (res.status === 410 && cursor) return this.resetPage();
+                        const json = await res.json();
+                        this.page = json.items || [];
+                        this.pageTotal = json.total;
+                        this.nextCursor = json.next_cursor;
+                    } catch (e) {
+                        console.error(e);
+                    } finally {
+                        this.pageLoading = false;
+                    }
+                },
+
+                // Filters and search restart from the first page; typing is debounced
+                queueQuery() {
+                    clearTimeout(this.queryTimer);
+                    this.queryTimer = setTimeout(() => this.resetPage(), 250);
+                },
+                
+                resetPage() {
+                    this.cursorStack = [];
+                    this.pageCursor = null;
+                    return this.fetchPage();
+                },
+
+                nextPage() {
+                    if (!this.nextCursor) return;
+                    this.cursorStack.push(this.pageCursor);
+                    this.pageCursor = this.nextCursor;
+                    this.fetchPage(this.pageCursor);
+                },
+
+                prevPage() {
+                    if (this.cursorStack.length === 0) return;
+                    this.pageCursor = this.cursorStack.pop();
+                    this.fetchPage(this.pageCursor);
+                },
+
+                pageRange() {
+                    const first = this.cursorStack.length * this.pageSize;
+                    if (this.page.length === 0) return 'No rows';
+                    return `Showing ${first + 1}-${first + this.page.length} of ${this.pageTotal}`;
                 },
                 
                 timeAgo(dateString) {
@@ -980,48 +1036,10 @@ HTML_TEMPLATE = r"""
                     return 'risk-low';
                 },
 
-                get filteredUnified() {
-                    let list = this.unified;
-                    
-                    // Filter by Source Dropdown
-                    if (this.selectedSource !== 'all') {
-                        list = list.filter(item => item.source === this.selectedSource);
-                    }
-                    
-                    // Filter by Chips
-                    if (this.activeFilter === 'correlated') {
-                        list = list.filter(item => item.correlated === true);
-                    } else if (this.activeFilter !== 'all') {
-                        list = list.filter(item => item.category === this.activeFilter);
-                    }
-                    
-                    // Search Query
-                    if (!this.searchQuery) return list;
-                    const q = this.searchQuery.toLowerCase();
-                    return list.filter(i => 
-                        i.ioc.toLowerCase().includes(q) || 
-                        i.type.toLowerCase().includes(q) || 
-                        i.source.toLowerCase().includes(q) ||
-                        i.details.toLowerCase().includes(q)
-                    );
-                },
-
                 updateMetrics() {
-                    const count = (arr) => arr ? arr.length : 0;
-                    
-                    const correlatedCount = this.unified.filter(i => i.correlated).length;
-                    this.metrics[0].value = correlatedCount;
-                    
-                    this.metrics[1].value = count(this.data.sans) + count(this.data.binary) + count(this.data.cins) + count(this.data.spamhaus) + count(this.data.stopforum) + count(this.data.darklist) + count(this.data.apache) + count(this.data.mail) + count(this.data.ftp) + count(this.data.imap) + count(this.data.sip) + count(this.data.cybercure) + count(this.data.rutgers) + count(this.data.nipr) + count(this.data.uce);
-                    this.metrics[2].value = count(this.data.feodo) + count(this.data.botvrij) + count(this.data.threatfox) + count(this.data.sslbl) + count(this.data.bambenek) + count(this.data.cybercrime) + count(this.data.dga) + count(this.data.bots);
-                    this.metrics[3].value = count(this.data.urlhaus) + count(this.data.vxvault) + count(this.data.et) + count(this.data.osint) + count(this.data.urlvir) + count(this.data.mdl) + count(this.data.cleanmx);
-                    this.metrics[4].value = count(this.data.openphish) + count(this.data.phishdb) + count(this.data.phishstats);
-                    this.metrics[5].value = count(this.data.bazaar);
-                    this.metrics[6].value = count(this.data.cisa);
-                    this.metrics[7].value = count(this.data.osint);
-                    this.metrics[8].value = count(this.data.tor) + count(this.data.proxies);
-                    this.metrics[9].value = count(this.data.blocklist) + count(this.data.greensnow);
-                    this.metrics[10].value = count(this.data.coinblocker);
+                    // Per-card counts come from the feed registry's `metrics` declarations
+                    const cards = this.summary.metrics || {};
+                    this.metrics.forEach(m => m.value = m.key === 'correlated' ? this.summary.correlated : (cards[m.key] || 0));
                 },
 
                 renderMap() {
@@ -1065,16 +1083,7 @@ HTML_TEMPLATE = r"""
                 },
 
                 renderRadar() {
-                    const stats = { 'Malware': 0, 'Phishing': 0, 'Botnets': 0, 'Crypto': 0, 'Scanners': 0 };
-                    
-                    this.unified.forEach(u => {
-                        const t = u.type.toLowerCase();
-                        if(t.includes('malware') || t.includes('hash') || t.includes('compromised') || t.includes('virus')) stats['Malware']++;
-                        else if(t.includes('phish')) stats['Phishing']++;
-                        else if(t.includes('botnet') || t.includes('cert') || t.includes('c2') || t.includes('bot')) stats['Botnets']++;
-                        else if(t.includes('crypto')) stats['Crypto']++;
-                        else stats['Scanners']++;
-                    });
+                    const stats = { 'Malware': 0, 'Phishing': 0, 'Botnets': 0, 'Crypto': 0, 'Scanners': 0, ...this.summary.radar };
                     
                     const maxVal = Math.max(...Object.values(stats)) || 1;
                     
@@ -1129,24 +1138,34 @@ HTML_TEMPLATE = r"""
                     }, 3000);
                 },
 
-                exportJSON() {
-                    const dataStr = "data:text/json;charset=utf-8," + encodeURIComponent(JSON.stringify(this.unified, null, 2));
+                // Exports take the current filters, up to the server's page limit
+                async exportRows() {
+                    const res = await fetch('/api/iocs?' + this.queryParams({ limit: 5000 }));
+                    const json = await res.json();
+                    return json.items || [];
+                },
+
+                async exportJSON() {
+                    const rows = await this.exportRows();
+                    const dataStr = "data:text/json;charset=utf-8," + encodeURIComponent(JSON.stringify(rows, null, 2));
                     this.downloadFile(dataStr, "hunters_gaze_export.json");
                 },
 
-                exportCSV() {
+                async exportCSV() {
+                    const rows = await this.exportRows();
                     let csvContent = "data:text/csv;charset=utf-8,Source,Time,IOC,Type,Risk,Details\\n";
-                    this.unified.forEach(row => {
+                    rows.forEach(row => {
                         csvContent += `${row.source},${row.rawTime},${row.ioc},${row.type},${row.risk},"${row.details}"\\n`;
                     });
                     this.downloadFile(csvContent, "hunters_gaze_export.csv");
                 },
                 
-                exportSTIX() {
+                async exportSTIX() {
+                    const rows = await this.exportRows();
                     const bundle = {
                         type: "bundle",
                         id: "bundle--" + crypto.randomUUID(),
-                        objects: this.unified.map(item => ({
+                        objects: rows.map(item => ({
                             type: "indicator",
                             id: "indicator--" + crypto.randomUUID(),
                             created: new Date().toISOString(),
@@ -1173,8 +1192,12 @@ HTML_TEMPLATE = r"""
                 },
 
                 init() {
-                    this.fetchData();
-                    setInterval(() => this.fetchData(), 60000);
+                    ['searchQuery', 'activeFilter', 'selectedSource'].forEach(key => this.$watch(key, () => this.queueQuery()));
+                    this.$watch('activeTab', tab => { if (tab === 'health') this.fetchHealth(); });
+                    this.fetchData().then(() => this.connectStream());
+                    // Polling is only the fallback for when the push stream is down
+                    setInterval(() => { if (!this.isStreaming) this.fetchData(); }, 60000);
+                    setInterval(() => { this.clock = Date.now(); }, 30000);
                 }
             }))
         })
@@ -1183,17 +1206,1300 @@ HTML_TEMPLATE = r"""
 </html>
 """
 
+# --- FEED CACHE ---
+
+class NotModified(Exception):
+    """Raised by fetch_with_timeout when upstream answers 304 to a revalidation"""
+
+class FeedCache:
+    """Per-URL parsed results plus the ETag / Last-Modified validators to revalidate them"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def fresh(self, url, ttl):
+        """Returns the cached result if it is younger than ttl seconds, else None"""
+        entry = self._entries.get(url)
+        if entry and entry.get('result') is not None and time.monotonic() - entry['checked_at'] < ttl:
+            return entry['result']
+        return None
+
+    def validators(self, url):
+        entry = self._entries.get(url) or {}
+        if entry.get('result') is None:
+            return {}
+        headers = {}
+        if entry.get('etag'): headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'): headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def remember(self, url, response):
+        """Keeps the validators of a fresh 200 until its parsed result is stored"""
+        with self._lock:
+            entry = self._entries.setdefault(url, {})
+            entry['etag'] = response.headers.get('ETag')
+            entry['last_modified'] = response.headers.get('Last-Modified')
+
+    def store(self, url, result):
+        with self._lock:
+            entry = self._entries.setdefault(url, {})
+            entry['result'] = result
+            entry['checked_at'] = time.monotonic()
+
+    def revalidated(self, url):
+        """Marks a 304 as a fresh check and hands back the already-parsed result.
+        None (and the validators dropped) when there is no result to reuse."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or entry.get('result') is None:
+                self._entries.pop(url, None)
+                return None
+            entry['checked_at'] = time.monotonic()
+            return entry['result']
+
+    def forget(self, url):
+        with self._lock:
+            self._entries.pop(url, None)
+
+    def tags(self, url):
+        """(ETag, Last-Modified) last seen for url"""
+        entry = self._entries.get(url) or {}
+        return entry.get('etag'), entry.get('last_modified')
+
+    def seed(self, url, result, etag, last_modified):
+        """Restores a persisted result; it is revalidated on the next fetch"""
+        with self._lock:
+            self._entries[url] = {'result': result, 'checked_at': float('-inf'), 'etag': etag, 'last_modified': last_modified}
+
+FEED_CACHE = FeedCache()
+
+# --- FEED TELEMETRY ---
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 3, 5, 10)   # Upper bounds (seconds) of the latency histogram
+
+def error_class(exc):
+    """Short label for a failed fetch: 'HTTP 403', 'ConnectTimeout', 'JSONDecodeError', ..."""
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return f"HTTP {exc.response.status_code}"
+    return type(exc).__name__
+
+class FeedStats:
+    """Running fetch numbers for one feed"""
+
+    def __init__(self):
+        self.outcomes = Counter()             # ok / empty / not_modified / cached / error
+        self.errors = Counter()               # error class -> count
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.bytes_total = 0
+        self.parse_seconds_total = 0.0
+        self.last = {'outcome': None, 'error': None, 'latency': None, 'parse_seconds': None,
+                     'bytes': 0, 'iocs': 0, 'last_success': None, 'last_error_at': None}
+
+class FeedTelemetry:
+    """Per-feed latency histogram, bytes, IOC counts, parse time, last success and
+    error classes. fetch_with_timeout() registers its response on the calling
+    thread; the scheduler closes the attempt with record()."""
+
+    def __init__(self):
+        self.feeds = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def begin(self):
+        self._local.response = None
+        return time.perf_counter()
+
+    def track(self, response):
+        self._local.response = response
+
+    def record(self, key, outcome, started=None, iocs=0, error=None):
+        response = getattr(self._local, 'response', None)
+        self._local.response = None
+        latency = response.elapsed.total_seconds() if response is not None else None
+        # Body bytes as received (compressed); urllib3 counts them even after close
+        nbytes = response.raw.tell() if response is not None and hasattr(response.raw, 'tell') else 0
+        total = time.perf_counter() - started if started is not None else None
+        now = time.time()
+        with self._lock:
+            stats = self.feeds.setdefault(key, FeedStats())
+            stats.outcomes[outcome] += 1
+            last = stats.last
+            last['outcome'] = outcome
+            if response is not None:
+                last['bytes'] = nbytes
+            if latency is not None:
+                stats.latency_sum += latency
+                stats.latency_count += 1
+                for i, bound in enumerate(LATENCY_BUCKETS):
+                    if latency <= bound:
+                        stats.buckets[i] += 1
+                last['latency'] = round(latency, 4)
+            stats.bytes_total += nbytes
+            if total is not None and outcome in ('ok', 'empty'):
+                # Body download, parsing, normalization and indexing after the headers
+                parse = max(0.0, total - (latency or 0))
+                stats.parse_seconds_total += parse
+                last.update(parse_seconds=round(parse, 4), iocs=iocs)
+            if outcome in ('ok', 'not_modified'):
+                last['last_success'] = now
+            if error is not None:
+                stats.errors[error_class(error)] += 1
+                last.update(error=error_class(error), last_error_at=now)
+            elif outcome != 'cached':
+                last['error'] = None
+
+    def status(self):
+        """JSON-friendly per-feed health"""
+        with self._lock:
+            return {key: dict(stats.last, fetches=dict(stats.outcomes), errors=dict(stats.errors),
+                              avg_latency=round(stats.latency_sum / stats.latency_count, 4) if stats.latency_count else None)
+                    for key, stats in self.feeds.items()}
+
+    def prometheus(self):
+        """Prometheus text exposition of every feed's numbers"""
+        out = []
+        def family(name, kind, help_text):
+            out.append(f"# HELP hunters_gaze_{name} {help_text}")
+            out.append(f"# TYPE hunters_gaze_{name} {kind}")
+        with self._lock:
+            feeds = sorted(self.feeds.items())
+            family('feed_fetch_latency_seconds', 'histogram', 'Time from request to upstream response headers.')
+            for key, stats in feeds:
+                for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                    out.append(f'hunters_gaze_feed_fetch_latency_seconds_bucket{{feed="{key}",le="{bound}"}} {count}')
+                out.append(f'hunters_gaze_feed_fetch_latency_seconds_bucket{{feed="{key}",le="+Inf"}} {stats.latency_count}')
+                out.append(f'hunters_gaze_feed_fetch_latency_seconds_sum{{feed="{key}"}} {stats.latency_sum}')
+                out.append(f'hunters_gaze_feed_fetch_latency_seconds_count{{feed="{key}"}} {stats.latency_count}')
+            family('feed_fetches_total', 'counter', 'Fetch attempts by outcome.')
+            for key, stats in feeds:
+                for outcome, count in sorted(stats.outcomes.items()):
+                    out.append(f'hunters_gaze_feed_fetches_total{{feed="{key}",outcome="{outcome}"}} {count}')
+            family('feed_errors_total', 'counter', 'Failed fetches by error class.')
+            for key, stats in feeds:
+                for error, count in sorted(stats.errors.items()):
+                    out.append(f'hunters_gaze_feed_errors_total{{feed="{key}",error="{error}"}} {count}')
+            family('feed_bytes_total', 'counter', 'Response body bytes received.')
+            for key, stats in feeds:
+                out.append(f'hunters_gaze_feed_bytes_total{{feed="{key}"}} {stats.bytes_total}')
+            family('feed_parse_seconds_total', 'counter', 'Time spent reading, parsing and indexing bodies.')
+            for key, stats in feeds:
+                out.append(f'hunters_gaze_feed_parse_seconds_total{{feed="{key}"}} {stats.parse_seconds_total}')
+            family('feed_iocs', 'gauge', 'IOCs parsed on the last successful fetch.')
+            for key, stats in feeds:
+                out.append(f'hunters_gaze_feed_iocs{{feed="{key}"}} {stats.last["iocs"]}')
+            family('feed_last_success_timestamp_seconds', 'gauge', 'Unix time of the last fetch that returned data or a 304.')
+            for key, stats in feeds:
+                if stats.last['last_success'] is not None:
+                    out.append(f'hunters_gaze_feed_last_success_timestamp_seconds{{feed="{key}"}} {stats.last["last_success"]}')
+            family('feed_up', 'gauge', 'Whether the last fetch attempt failed (0) or not (1).')
+            for key, stats in feeds:
+                out.append(f'hunters_gaze_feed_up{{feed="{key}"}} {int(stats.last["error"] is None)}')
+        return '\n'.join(out) + '\n'
+
+TELEMETRY = FeedTelemetry()
+
 # --- HELPERS ---
 
-def fetch_with_timeout(url, timeout=3): # Reduced timeout for faster fallback
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=timeout)
+def fetch_with_timeout(url, timeout=3, stream=False): # Reduced timeout for faster fallback
+    """Conditional GET; network errors and non-2xx statuses raise for the caller to record"""
+    response = SESSION.get(url, headers=FEED_CACHE.validators(url), timeout=timeout, stream=stream)
+    TELEMETRY.track(response)
+    if response.status_code == 304:
+        response.close()
+        raise NotModified(url)
+    if not response.ok:
+        response.close()
         response.raise_for_status()
-        return response
-    except Exception as e:
+    FEED_CACHE.remember(url, response)
+    return response
+
+@contextmanager
+def streamed(resp):
+    """Closes a streamed feed response once its rows are taken. The unread rest of a
+    small body is read off first: urllib3 drops a connection closed mid-body, and
+    the next refresh of that host would pay a fresh TLS handshake. Bodies with more
+    than DRAIN_LIMIT bytes left are still abandoned."""
+    try:
+        yield resp
+    finally:
+        drain(resp)
+        resp.close()
+
+def drain(resp, limit=DRAIN_LIMIT):
+    raw = resp.raw
+    length = resp.headers.get('Content-Length', '')
+    if length.isdigit() and int(length) - raw.tell() > limit:
+        return
+    try:
+        while limit > 0:
+            chunk = raw.read(min(limit, 65536), decode_content=False)
+            if not chunk:
+                break
+            limit -= len(chunk)
+    except Exception:
+        pass    # The connection is dropped on close, as without draining
+
+def stream_lines(resp):
+    """Yields decoded lines from a streamed response without buffering the body"""
+    if resp.encoding is None:
+        resp.encoding = 'utf-8'
+    for line in resp.iter_lines(chunk_size=STREAM_CHUNK, decode_unicode=True):
+        yield line
+
+def take_rows(rows, ioc_key, limit, ingest=None):
+    """First `limit` rows of a lazy row iterator. With ingest (full-feed mode) the
+    rest of the feed is drained too, handing only each row's IOC value to ingest."""
+    if ingest is None:
+        return list(islice(rows, limit))
+    page = []
+    for row in rows:
+        ingest(row.get(ioc_key))
+        if limit is None or len(page) < limit:
+            page.append(row)
+    return page
+
+IOC_FIELDS = ('ip', 'url', 'domain', 'hash', 'cveID', 'sha1', 'ioc')
+
+def row_ioc(item):
+    """The indicator value of a feed row, whatever the feed calls that field"""
+    for field in IOC_FIELDS:
+        if item.get(field):
+            return item[field]
+    return None
+
+def has_rows(result):
+    return (isinstance(result, list) and len(result) > 0) or (isinstance(result, tuple) and len(result[0]) > 0)
+
+# --- IOC NORMALIZATION ---
+# Every value is canonicalized once per feed refresh before it is stored or
+# correlated: URLs keep their path and query with the scheme and host lowercased
+# (a scheme-less host/path is read as http://host/path), host:port collapses to the host, hosts are lowercased and punycoded, digests
+# lowercased, CVE ids uppercased. CIDRs are kept as-is. A URL's host is indexed
+# as a secondary key, so lookups can still tell which hosts serve listed URLs.
+IPV4_RE = re.compile(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}')
+HASH_RE = re.compile(r'[0-9a-fA-F]{32}|[0-9a-fA-F]{40}|[0-9a-fA-F]{64}')
+CIDR_RE = r'\d{1,3}(?:\.\d{1,3}){3}/\d{1,2}'
+CVE_RE = r'(?i)CVE-\d{4}-\d+'
+SCHEME_RE = r'^[A-Za-z][A-Za-z0-9+.-]*://'
+USERINFO_RE = r'^[^@/]*@'
+PATH_RE = r'[/?#].*$'
+BRACKETED_RE = r'^\[([^\]]*)\](?::\d+)?$'
+PORT_RE = r'^([^:]*):\d+$'
+HOST_RE = r'^(?:[A-Za-z][A-Za-z0-9+.-]*://)?(?:[^@/?#]*@)?([^/?#:\[\]@]+)(?::\d+)?(?:[/?#].*)?$'
+# host.tld[:port] followed by a path or query: a URL that lost its scheme
+SCHEMELESS_URL_RE = r'^(?:[^@/?#\s]*@)?[^/?#:@\s]+\.[^/?#:@\s]+(?::\d+)?(?:/[^?#]*[^/?#]|/?\?.)'
+URL_RE = re.compile(r'^([A-Za-z][A-Za-z0-9+.-]*)://(?:[^@/?#]*@)?([^/?#:\[\]@]+)(?::(\d+))?([/?][^#]*)?(?:#.*)?$')
+NON_ASCII_RE = r'[^\x00-\x7f]'
+DEFAULT_PORTS = {'http': 80, 'https': 443, 'ftp': 21}
+NORMALIZE_BATCH = 50000     # Raw values buffered per vectorized normalization pass
+
+def punycode(host):
+    try:
+        return host.encode('idna').decode('ascii')
+    except UnicodeError:
+        return host
+
+def canonical_url(value):
+    """scheme://host[:port]/path[?query]: scheme and host lowercased (IDNA), userinfo,
+    default port and fragment dropped; '' when there is no host"""
+    match = URL_RE.match(value)
+    # The common shape is split by one regex; oddities (IPv6, stray '@', odd ports) go through urlsplit.
+    # A port out of range or not a number is kept as written: dropping it would match the bare host
+    if match:
+        scheme, host, port, path = match.groups()
+        port, path = (int(port) if int(port) <= 65535 else port) if port else None, path or ''
+        path, query = path.split('?', 1) if '?' in path else (path, None)
+    else:
+        try:
+            parts = urlsplit(value)
+            host = parts.hostname or ''
+        except ValueError:
+            return ''       # unbalanced IPv6 brackets: no usable host
+        try:
+            port = parts.port
+        except ValueError:
+            port = parts.netloc.rpartition('@')[2].rpartition(']')[2].rpartition(':')[2]
+        scheme, path, query = parts.scheme, parts.path, parts.query or None
+    host = host.lower().rstrip('.')
+    if not host:
+        return ''
+    if not host.isascii():
+        host = punycode(host)
+    scheme = scheme.lower()
+    netloc = f"[{host}]" if ':' in host else host
+    if port is not None and DEFAULT_PORTS.get(scheme) != port:
+        netloc += f":{port}"
+    return f"{scheme}://{netloc}{path or '/'}" + (f"?{query}" if query else '')
+
+def url_host(ioc):
+    """Host of a canonical URL IOC, None for any other kind"""
+    if '://' not in ioc:
+        return None
+    host = urlsplit(ioc).hostname
+    return host or None
+
+def normalize_iocs(values):
+    """Vectorized canonicalization of a batch of raw IOC strings (same rules as normalize_ioc)"""
+    out = pd.Series(values, dtype=object).fillna('').astype(str).str.strip()
+    # Bare IPv4 is by far the most common value and already canonical, so every
+    # later pass only runs over what is left
+    rest = out[~out.str.fullmatch(IPV4_RE.pattern)]
+    rest = rest[~rest.str.fullmatch(CIDR_RE)]
+    is_hash = rest.str.fullmatch(HASH_RE.pattern)
+    out[rest.index[is_hash]] = rest[is_hash].str.lower()
+    rest = rest[~is_hash]
+    is_cve = rest.str.fullmatch(CVE_RE)
+    out[rest.index[is_cve]] = rest[is_cve].str.upper()
+    rest = rest[~is_cve]
+    is_url = rest.str.contains(SCHEME_RE, regex=True)
+    out[rest.index[is_url]] = rest[is_url].map(canonical_url)
+    rest = rest[~is_url]
+    is_url = rest.str.contains(SCHEMELESS_URL_RE, regex=True)
+    out[rest.index[is_url]] = ('http://' + rest[is_url]).map(canonical_url)
+    rest = rest[~is_url]
+    # One extract covers host[:port] (a bare trailing '/' or fragment included); only oddities
+    # (IPv6, odd ports) go through the rule-by-rule chain
+    hosts = rest.str.extract(HOST_RE, expand=False)
+    odd = rest[hosts.isna()]
+    hosts[odd.index] = (odd.str.replace(SCHEME_RE, '', regex=True)
+                           .str.replace(USERINFO_RE, '', regex=True)
+                           .str.replace(PATH_RE, '', regex=True)
+                           .str.replace(BRACKETED_RE, r'\1', regex=True)
+                           .str.replace(PORT_RE, r'\1', regex=True))
+    hosts = hosts.astype(object).str.lower().str.rstrip('.')
+    unicode_hosts = hosts.str.contains(NON_ASCII_RE, regex=True)
+    hosts[unicode_hosts] = hosts[unicode_hosts].map(punycode)
+    out[hosts.index] = hosts
+    return out.tolist()
+
+SCALAR_RULES = [(re.compile(pattern), repl) for pattern, repl in (
+    (SCHEME_RE, ''), (USERINFO_RE, ''), (PATH_RE, ''), (BRACKETED_RE, r'\1'), (PORT_RE, r'\1'))]
+
+def normalize_ioc(value):
+    """Single-value twin of normalize_iocs, used for point lookups"""
+    value = (value or '').strip()
+    if IPV4_RE.fullmatch(value) or re.fullmatch(CIDR_RE, value):
+        return value
+    if HASH_RE.fullmatch(value):
+        return value.lower()
+    if re.fullmatch(CVE_RE, value):
+        return value.upper()
+    if re.match(SCHEME_RE, value):
+        return canonical_url(value)
+    if re.match(SCHEMELESS_URL_RE, value):
+        return canonical_url('http://' + value)
+    for pattern, repl in SCALAR_RULES:
+        value = pattern.sub(repl, value, count=1)
+    value = value.lower().rstrip('.')
+    return punycode(value) if not value.isascii() else value
+
+# --- COMPACT IOC STORE ---
+# Full-feed mode keeps every IOC of every feed, so values are stored by kind:
+# IPv4 as packed 32-bit ints, hashes as raw fixed-width digests, everything
+# else (domains, CIDRs, CVEs, IPv6) as interned strings shared across feeds.
+def ipv4_to_int(value):
+    if not IPV4_RE.fullmatch(value):
+        return None
+    try:
+        return int.from_bytes(socket.inet_aton(value), 'big')
+    except OSError:
+        return None
+
+PREFIX_MASKS = [(0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF for prefix in range(33)]
+
+def int_to_ipv4(packed):
+    return socket.inet_ntoa(packed.to_bytes(4, 'big'))
+
+def parse_cidr(value):
+    """(network int, prefix length) for an IPv4 CIDR string, else None"""
+    if '/' not in value or not re.fullmatch(CIDR_RE, value):
         return None
+    address, prefix = value.split('/')
+    packed, prefix = ipv4_to_int(address), int(prefix)
+    if packed is None or prefix > 32:
+        return None
+    return packed & PREFIX_MASKS[prefix], prefix
+
+class TextIndex:
+    """Substring search over a frozen column. Every value is lowercased into one
+    newline-joined UTF-8 buffer, and every byte trigram inside a value is indexed
+    with the sorted positions it occurs at. A query of three bytes or more is the
+    intersection of its trigrams' position lists, each shifted back by the
+    trigram's offset in the query, so it yields exact match positions without
+    reading the text. Shorter queries scan the buffer SEARCH_CHUNK bytes at a time.
+    The arrays are written into segment files, so workers map one shared copy."""
+    __slots__ = ('text', 'base', 'size', 'starts', 'grams', 'bounds', 'postings')
+
+    def __init__(self, values):
+        values = [value.lower().encode() for value in values]
+        text = b'\n'.join(values) + b'\n'
+        starts = np.fromiter(accumulate((len(value) + 1 for value in values), initial=0), np.uint32, len(values) + 1)
+        chars = np.frombuffer(text, np.uint8)
+        codes = (chars[:-2].astype(np.uint32) << 16) | (chars[1:-1].astype(np.uint32) << 8) | chars[2:]
+        newline = chars == ord('\n')
+        inside = ~(newline[:-2] | newline[1:-1] | newline[2:])
+        # One sort of (trigram, position) pairs packed in 64 bits: grouped by trigram, positions ascending
+        keys = codes[inside].astype(np.uint64) << np.uint64(32) | np.flatnonzero(inside).astype(np.uint64)
+        keys.sort()
+        codes = (keys >> np.uint64(32)).astype(np.uint32)
+        first = np.flatnonzero(np.concatenate((codes[:1] == codes[:1], codes[1:] != codes[:-1])))
+        self._assign(text, 0, len(text), starts, codes[first], np.append(first, len(codes)).astype(np.uint32), keys.astype(np.uint32))
+
+    @classmethod
+    def mapped(cls, text, base, size, starts, grams, bounds, postings):
+        """An index over arrays that already exist, e.g. views into a segment mapping"""
+        index = cls.__new__(cls)
+        index._assign(text, base, size, starts, grams, bounds, postings)
+        return index
+
+    def _assign(self, text, base, size, starts, grams, bounds, postings):
+        self.text, self.base, self.size = text, base, size      # text: bytes or mmap; this index covers text[base:base + size]
+        self.starts, self.grams, self.bounds, self.postings = starts, grams, bounds, postings
+
+    def nbytes(self):
+        return self.size + self.starts.nbytes + self.grams.nbytes + self.bounds.nbytes + self.postings.nbytes
+
+    def _matches(self, q):
+        """Sorted text offsets where q (three bytes or more) starts"""
+        shifts = list(range(0, len(q) - 2, 3))
+        if shifts[-1] != len(q) - 3:
+            shifts.append(len(q) - 3)
+        lists = []
+        for k in shifts:
+            code = np.uint32(q[k] << 16 | q[k + 1] << 8 | q[k + 2])
+            i = int(np.searchsorted(self.grams, code))
+            if i == len(self.grams) or self.grams[i] != code:
+                return np.empty(0, np.uint32)
+            lists.append((int(self.bounds[i + 1] - self.bounds[i]), k, self.postings[self.bounds[i]:self.bounds[i + 1]]))
+        lists.sort(key=lambda entry: entry[0])      # shortest list first, so every later probe is small
+        _, k, found = lists[0]
+        found = found[found >= k] - np.uint32(k)
+        for _, k, other in lists[1:]:
+            probe = found + np.uint32(k)
+            at = np.searchsorted(other, probe).clip(max=len(other) - 1)
+            found = found[other[at] == probe]
+        return found
+
+    def _values(self, q):
+        """Sorted positions of the values containing q (three bytes or more), with repeats"""
+        return np.searchsorted(self.starts, self._matches(q), 'right') - 1
+
+    def find(self, q, start=0):
+        """Positions of the values containing q, ascending from position `start`"""
+        if not q or '\n' in q or start >= len(self.starts) - 1:
+            return
+        q = q.lower().encode()
+        if len(q) >= 3:
+            found = self._values(q)
+            found = found[np.searchsorted(found, start):]
+            previous = None
+            for chunk in range(0, len(found), PAGE_SIZE):
+                for i in found[chunk:chunk + PAGE_SIZE].tolist():
+                    if i != previous:
+                        yield i
+                    previous = i
+            return
+        pos, end = self.base + int(self.starts[start]), self.base + self.size
+        while True:
+            pos = self.text.find(q, pos, end)
+            if pos < 0:
+                return
+            i = int(np.searchsorted(self.starts, np.uint32(pos - self.base), 'right')) - 1
+            yield i
+            pos = self.base + int(self.starts[i + 1])
+
+    def count(self, q):
+        """Number of values containing q"""
+        q, values = q.lower().encode(), len(self.starts) - 1
+        if not q or b'\n' in q or not values:
+            return 0
+        if len(q) >= 3:
+            found = self._values(q)
+            return int(len(found) and 1 + np.count_nonzero(found[1:] != found[:-1]))
+        total, a = 0, 0
+        while a < values:
+            b = int(np.searchsorted(self.starts, self.starts[a] + SEARCH_CHUNK, 'right')) - 1
+            b = min(max(b, a + 1), values)
+            offset = int(self.starts[a])
+            text = np.frombuffer(self.text, np.uint8, int(self.starts[b]) - offset, self.base + offset)
+            span = len(text) - len(q) + 1
+            hits = np.zeros(len(text), bool)
+            hits[:span] = text[:span] == q[0]
+            if len(q) == 2:
+                hits[:span] &= text[1:] == q[1]
+            total += int(np.count_nonzero(np.logical_or.reduceat(hits, self.starts[a:b] - np.uint32(offset))))
+            a = b
+        return total
+
+class IOCColumn:
+    """One feed's IOC values; filled with add(), then freeze() sorts, dedupes and
+    builds the search index. Raw values are buffered and normalized in batches
+    on their way in."""
+    __slots__ = ('ipv4', 'hashes', 'strings', 'pending', 'search')
+
+    def __init__(self):
+        self.ipv4 = array('I')
+        self.hashes = {}        # digest size in bytes -> concatenated digests
+        self.strings = set()
+        self.pending = []
+        self.search = None
+
+    def add(self, value):
+        if not value or not isinstance(value, str):
+            return
+        self.pending.append(value)
+        if len(self.pending) >= NORMALIZE_BATCH:
+            self.flush()
+
+    def flush(self):
+        for value in normalize_iocs(self.pending):
+            self._add_normalized(value)
+        self.pending = []
+
+    def _add_normalized(self, value):
+        packed = ipv4_to_int(value)
+        if packed is not None:
+            self.ipv4.append(packed)
+        elif HASH_RE.fullmatch(value):
+            digest = bytes.fromhex(value)
+            self.hashes.setdefault(len(digest), bytearray()).extend(digest)
+        elif value:
+            self.strings.add(sys.intern(value))
+
+    def freeze(self):
+        if self.pending:
+            self.flush()
+        self.ipv4 = array('I', sorted(set(self.ipv4)))
+        for size, blob in self.hashes.items():
+            digests = sorted({bytes(blob[i:i + size]) for i in range(0, len(blob), size)})
+            self.hashes[size] = b''.join(digests)
+        self.strings = tuple(sorted(self.strings))
+        self.search = TextIndex(self)
+        return self
+
+    def __len__(self):
+        return len(self.ipv4) + sum(len(blob) // size for size, blob in self.hashes.items()) + len(self.strings)
+
+    def __contains__(self, value):
+        """Membership of an already-normalized value"""
+        packed = ipv4_to_int(value)
+        if packed is not None:
+            i = bisect.bisect_left(self.ipv4, packed)
+            return i < len(self.ipv4) and self.ipv4[i] == packed
+        if HASH_RE.fullmatch(value):
+            digest = bytes.fromhex(value)
+            blob = self.hashes.get(len(digest), b'')
+            lo, hi = 0, len(blob) // len(digest)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                probe = blob[mid * len(digest):(mid + 1) * len(digest)]
+                if probe == digest: return True
+                if probe < digest: lo = mid + 1
+                else: hi = mid
+            return False
+        i = bisect.bisect_left(self.strings, value)
+        return i < len(self.strings) and self.strings[i] == value
+
+    def __iter__(self):
+        for packed in self.ipv4:
+            yield int_to_ipv4(packed)
+        yield from self.others()
+
+    def others(self):
+        """The non-IPv4 values, in iteration order"""
+        for size in sorted(self.hashes):
+            blob = self.hashes[size]
+            for i in range(0, len(blob), size):
+                yield blob[i:i + size].hex()
+        yield from self.strings
+
+    def __getitem__(self, i):
+        """i-th value in iteration order, so a frozen column can be paged without a copy"""
+        if i < len(self.ipv4):
+            return int_to_ipv4(self.ipv4[i])
+        i -= len(self.ipv4)
+        for size in sorted(self.hashes):
+            count = len(self.hashes[size]) // size
+            if i < count:
+                return self.hashes[size][i * size:(i + 1) * size].hex()
+            i -= count
+        return self.strings[i]
+
+    def nbytes(self):
+        """Approximate footprint of the packed columns (interned strings counted once)"""
+        return (self.ipv4.itemsize * len(self.ipv4) + sum(len(blob) for blob in self.hashes.values())
+                + sum(sys.getsizeof(v) for v in self.strings)
+                + (self.search.nbytes() if self.search else 0))
+
+class IOCStore:
+    """Per-feed IOC columns; a refresh swaps in a whole new frozen column"""
+
+    def __init__(self):
+        self.columns = {}
+
+    def replace(self, key, column):
+        self.columns[key] = column
+
+    def __len__(self):
+        return sum(len(column) for column in self.columns.values())
+
+    def totals(self):
+        return {key: len(column) for key, column in self.columns.items()}
+
+IOC_STORE = IOCStore()
+
+# --- CORRELATION INDEX ---
+class CorrelationIndex:
+    """Normalized IOC -> which feeds list it, when it was first seen and how often it
+    was (re)listed. Kept up to date from per-feed diffs, never rebuilt from scratch.
+    Source sets are bitmasks, hence MAX_FEEDS. IPv4, the bulk of full-ingest feeds,
+    live in sorted parallel numpy arrays (24 bytes per address) patched with each
+    refresh's diff in one vectorized step; hashes (by raw digest) and other values
+    (by string) map to slots in parallel arrays.
+
+    Listed IPv4 networks (Spamhaus DROP, firehol ipsets, ...) also go into one
+    hash table per prefix length, so an IP is matched against every range that
+    contains it with at most one probe per prefix length in use."""
+
+    def __init__(self):
+        self._ipv4 = np.empty(0, np.uint32)            # sorted packed IPv4
+        self._ipv4_sources = np.empty(0, np.uint64)    # bitmask of feed bits
+        self._ipv4_first_seen = np.empty(0, np.float64)
+        self._ipv4_hits = np.empty(0, np.uint32)
+        self._digests = {}                # raw hash digest -> slot
+        self._strings = {}                # any other IOC -> slot
+        self._sources = array('Q')        # per slot: bitmask of feed bits
+        self._first_seen = array('d')
+        self._hits = array('I')
+        self._free = []
+        self._bits = {}                   # feed key -> bit
+        self._refreshed = {}              # feed key -> last refresh (epoch)
+        self._ranges = {}                 # prefix length -> {network int: bitmask}
+        self._range_arrays = None         # sorted numpy copies of _ranges for batch matching
+        self._url_hosts = {}              # host of listed URLs -> {feed bit: URL count}
+        self._shared = set()              # non-IPv4 IOCs listed by two or more feeds
+        self._lock = threading.Lock()
+
+    def _bit(self, source):
+        if source not in self._bits:
+            if len(self._bits) >= MAX_FEEDS:
+                raise ValueError(f"CorrelationIndex supports at most {MAX_FEEDS} feeds")
+            self._bits[source] = 1 << len(self._bits)
+        return self._bits[source]
+
+    def _table(self, ioc):
+        """(dict, key) a non-IPv4 IOC's slot is filed under"""
+        if HASH_RE.fullmatch(ioc):
+            return self._digests, bytes.fromhex(ioc)
+        return self._strings, ioc
+
+    def _record(self, ioc, packed=None):
+        """(bitmask, first_seen, hits) for one normalized IOC (packed: its ipv4_to_int), or None"""
+        if packed is not None:
+            # A numpy scalar of the array's dtype; a Python int makes numpy cast the whole array
+            i = int(np.searchsorted(self._ipv4, np.uint32(packed)))
+            if i < len(self._ipv4) and self._ipv4[i] == packed:
+                return int(self._ipv4_sources[i]), float(self._ipv4_first_seen[i]), int(self._ipv4_hits[i])
+            return None
+        table, key = self._table(ioc)
+        slot = table.get(key)
+        return (self._sources[slot], self._first_seen[slot], self._hits[slot]) if slot is not None else None
+
+    def update(self, source, old_column, new_column):
+        """Applies one feed refresh; only IOCs that entered or left the feed are touched"""
+        now = time.time()
+        bit = self._bit(source)
+        if new_column is old_column:
+            self._refreshed[source] = now
+            return
+        old_ipv4 = np.frombuffer(old_column.ipv4, np.uint32) if old_column is not None else np.empty(0, np.uint32)
+        new_ipv4 = np.frombuffer(new_column.ipv4, np.uint32)
+        added_ipv4 = np.setdiff1d(new_ipv4, old_ipv4, assume_unique=True)
+        removed_ipv4 = np.setdiff1d(old_ipv4, new_ipv4, assume_unique=True)
+        added = [ioc for ioc in new_column.others() if old_column is None or ioc not in old_column]
+        removed = [ioc for ioc in old_column.others() if ioc not in new_column] if old_column is not None else []
+        with self._lock:
+            self._update_ipv4(np.uint64(bit), now, added_ipv4, removed_ipv4)
+            for ioc in added:
+                table, key = self._table(ioc)
+                slot = table.get(key)
+                if slot is None:
+                    if self._free:
+                        slot = self._free.pop()
+                        self._sources[slot], self._first_seen[slot], self._hits[slot] = 0, now, 0
+                    else:
+                        slot = len(self._sources)
+                        self._sources.append(0); self._first_seen.append(now); self._hits.append(0)
+                    table[key] = slot
+                self._sources[slot] |= bit
+                self._hits[slot] += 1
+                if self._sources[slot] & (self._sources[slot] - 1):
+                    self._shared.add(ioc)
+            for ioc in removed:
+                table, key = self._table(ioc)
+                slot = table.get(key)
+                if slot is None:
+                    continue
+                self._sources[slot] &= ~bit
+                if not self._sources[slot] & (self._sources[slot] - 1):
+                    self._shared.discard(ioc)
+                if not self._sources[slot]:
+                    del table[key]
+                    self._free.append(slot)
+            for host in filter(None, map(url_host, added)):
+                counts = self._url_hosts.setdefault(host, {})
+                counts[bit] = counts.get(bit, 0) + 1
+            for host in filter(None, map(url_host, removed)):
+                counts = self._url_hosts.get(host, {})
+                if counts.get(bit, 0) > 1:
+                    counts[bit] -= 1
+                elif bit in counts:
+                    del counts[bit]
+                    if not counts:
+                        del self._url_hosts[host]
+            self._range_arrays = None
+            for network, prefix in filter(None, map(parse_cidr, added)):
+                table = self._ranges.setdefault(prefix, {})
+                table[network] = table.get(network, 0) | bit
+            for network, prefix in filter(None, map(parse_cidr, removed)):
+                table = self._ranges.get(prefix, {})
+                if network in table:
+                    table[network] &= ~bit
+                    if not table[network]:
+                        del table[network]
+            self._refreshed[source] = now
+
+    def _update_ipv4(self, bit, now, added, removed):
+        """Merges one feed's added/removed IPv4 (sorted, unique) into the sorted arrays"""
+        pos = np.searchsorted(self._ipv4, added)
+        known = pos < len(self._ipv4)
+        known[known] = self._ipv4[pos[known]] == added[known]
+        self._ipv4_sources[pos[known]] |= bit
+        self._ipv4_hits[pos[known]] += 1
+        at, fresh = pos[~known], added[~known]
+        self._ipv4 = np.insert(self._ipv4, at, fresh)
+        self._ipv4_sources = np.insert(self._ipv4_sources, at, bit)
+        self._ipv4_first_seen = np.insert(self._ipv4_first_seen, at, now)
+        self._ipv4_hits = np.insert(self._ipv4_hits, at, 1)
+        pos = np.searchsorted(self._ipv4, removed)
+        known = pos < len(self._ipv4)
+        known[known] = self._ipv4[pos[known]] == removed[known]
+        self._ipv4_sources[pos[known]] &= ~bit
+        gone = pos[known][self._ipv4_sources[pos[known]] == 0]
+        if len(gone):
+            self._ipv4, self._ipv4_sources, self._ipv4_first_seen, self._ipv4_hits = (
+                np.delete(values, gone) for values in (self._ipv4, self._ipv4_sources, self._ipv4_first_seen, self._ipv4_hits))
+
+    def _containing(self, packed):
+        """(cidr, bitmask) for every listed range that contains a packed IPv4 (None: no ranges)"""
+        if packed is None:
+            return []
+        found = []
+        for prefix, table in self._ranges.items():
+            network = packed & PREFIX_MASKS[prefix]
+            mask = table.get(network)
+            if mask:
+                found.append((f"{int_to_ipv4(network)}/{prefix}", mask))
+        return found
+
+    def _find(self, ioc):
+        """(record, ranges, kind) for a normalized IOC, or None. kind is 'exact', 'range'
+        (only a listed network contains it) or 'host': a URL whose host is listed,
+        or a host serving listed URLs. A URL never matches other URLs on its host."""
+        packed = ipv4_to_int(ioc)
+        record, ranges = self._record(ioc, packed), self._containing(packed)
+        if record is not None or ranges:
+            return record, ranges, 'exact' if record is not None else 'range'
+        return self._find_host(ioc)
+
+    def _find_host(self, ioc):
+        host = url_host(ioc)
+        if host is not None:
+            packed = ipv4_to_int(host)
+            record, ranges = self._record(host, packed), self._containing(packed)
+        else:
+            counts = self._url_hosts.get(ioc)
+            record, ranges = ((sum(counts), None, 0) if counts else None), []    # distinct bits: the sum is the mask
+        return (record, ranges, 'host') if record is not None or ranges else None
+
+    def _describe(self, found, feeds=None):
+        """The lookup record for a _find() result; feeds memoizes the per-bitmask part across a batch"""
+        record, ranges, kind = found
+        mask, first_seen, hits = record if record is not None else (0, None, 0)
+        for _, range_mask in ranges:
+            mask |= range_mask
+        listing = feeds.get(mask) if feeds is not None else None
+        if listing is None:
+            sources = [key for key, bit in self._bits.items() if mask & bit]
+            # Still listed, so it was last seen on the latest refresh of any listing feed
+            last_seen = max(self._refreshed.get(key, 0) for key in sources)
+            listing = sources, last_seen, datetime.fromtimestamp(last_seen, timezone.utc).isoformat()
+            if feeds is not None:
+                feeds[mask] = listing
+        sources, last_seen, last_stamp = listing
+        return {
+            'sources': list(sources),
+            'count': len(sources),
+            'first_seen': datetime.fromtimestamp(first_seen, timezone.utc).isoformat() if first_seen is not None else last_stamp,
+            'last_seen': last_stamp,
+            'hits': hits,
+            'ranges': [{'cidr': cidr, 'sources': [key for key, bit in self._bits.items() if range_mask & bit]} for cidr, range_mask in ranges],
+            'match': kind,
+        }
+
+    def get(self, value):
+        """O(1) lookup (O(log n) for IPv4): {'sources', 'count', 'first_seen', 'last_seen', 'hits', 'ranges', 'match'} or None"""
+        return self.match(normalize_ioc(value))
+
+    def match(self, ioc):
+        """get() for an already-normalized IOC"""
+        with self._lock:
+            found = self._find(ioc)
+            return self._describe(found) if found is not None else None
+
+    def match_many(self, iocs):
+        """Yields (ioc, record) for every normalized IOC in the batch the index knows.
+        Each IOC is probed once: the batch's IPv4 go through one searchsorted over the
+        address arrays and one per CIDR prefix length in use; other kinds are dict probes."""
+        with self._lock:
+            packed = [ipv4_to_int(ioc) for ioc in iocs]
+            where = [i for i, value in enumerate(packed) if value is not None]
+            found = dict.fromkeys(range(len(iocs)))
+            if where:
+                values = np.fromiter((packed[i] for i in where), np.uint32, len(where))
+                pos = np.searchsorted(self._ipv4, values).clip(max=max(len(self._ipv4) - 1, 0))
+                exact = self._ipv4[pos] == values if len(self._ipv4) else np.zeros(len(values), bool)
+                pos = pos[exact]
+                records = dict(zip(np.flatnonzero(exact).tolist(), zip(
+                    self._ipv4_sources[pos].tolist(), self._ipv4_first_seen[pos].tolist(), self._ipv4_hits[pos].tolist())))
+                ranges = {}
+                for prefix, (networks, masks) in self._range_table().items():
+                    keys = values & np.uint32(PREFIX_MASKS[prefix])
+                    at = np.searchsorted(networks, keys).clip(max=len(networks) - 1)
+                    for k in np.flatnonzero(networks[at] == keys).tolist():
+                        ranges.setdefault(k, []).append((f"{int_to_ipv4(int(keys[k]))}/{prefix}", int(masks[at[k]])))
+                for k, i in enumerate(where):
+                    if k in records:
+                        found[i] = (records[k], ranges.get(k, []), 'exact')
+                    elif k in ranges:
+                        found[i] = (None, ranges[k], 'range')
+                    elif self._url_hosts:
+                        found[i] = self._find_host(iocs[i])
+            for i, ioc in enumerate(iocs):
+                if packed[i] is None:
+                    found[i] = self._find(ioc)
+            feeds = {}
+            matches = [(iocs[i], self._describe(hit, feeds)) for i, hit in found.items() if hit is not None]
+        yield from matches
+
+    def _range_table(self):
+        """{prefix: (sorted network array, bitmask array)}, rebuilt after ranges change"""
+        if self._range_arrays is None:
+            self._range_arrays = {}
+            for prefix, table in self._ranges.items():
+                if table:
+                    networks = np.array(sorted(table), np.uint32)
+                    self._range_arrays[prefix] = networks, np.array([table[int(n)] for n in networks], np.uint64)
+        return self._range_arrays
+
+    def shared_by_feed(self):
+        """Feed key -> IOCs it lists that at least one other feed lists too"""
+        shared = {}
+        with self._lock:
+            masks = self._ipv4_sources
+            multi = (masks & (masks - np.uint64(1))) != 0
+            for key, bit in self._bits.items():
+                listed = self._ipv4[multi & ((masks & np.uint64(bit)) != 0)]
+                if len(listed):
+                    shared[key] = [int_to_ipv4(int(packed)) for packed in listed]
+            for ioc in self._shared:
+                mask = self._record(ioc, ipv4_to_int(ioc))[0]
+                for key, bit in self._bits.items():
+                    if mask & bit:
+                        shared.setdefault(key, []).append(ioc)
+        return shared
+
+    def __len__(self):
+        return len(self._ipv4) + len(self._digests) + len(self._strings)
+
+CORRELATION = CorrelationIndex()
+
+# --- IOC SEGMENTS ---
+# With HUNTERS_GAZE_DATA_DIR set, every published snapshot's IOC columns are
+# also written out as immutable segment files, one per feed, and lookups read
+# them through mmap: N worker processes share one page-cache copy. A segment is
+# a header, a section table and 8-byte aligned sections of sorted fixed-width
+# values in host byte order:
+#   ipv4     packed 32-bit ints
+#   digest   raw hash digests, one section per digest size
+#   strings  (count + 1) 32-bit offsets into the UTF-8 blob that follows
+#   cidr     64-bit (network << 8 | prefix) keys; aux is the prefix-length bitmask
+#   hosts    the hosts of the URLs among the strings, laid out like strings
+# A MANIFEST names the segment of each feed; CURRENT names the live manifest and
+# is swapped with an atomic rename, so readers never see a half-written set.
+SEGMENT_MAGIC = b'HGSEG\x00\x01\x00'
+SEGMENT_HEADER = struct.Struct('<8sII')        # magic, section count, reserved
+SEGMENT_ENTRY = struct.Struct('<BBHIQQ')       # kind, reserved, width, count, offset, aux
+SEGMENT_RETRIES = 3     # Re-reads of CURRENT when a publish deletes the files it named mid-load
+SEG_IPV4, SEG_DIGEST, SEG_STRINGS, SEG_CIDR, SEG_HOSTS, SEG_TEXT, SEG_GRAMS = 1, 2, 3, 4, 5, 6, 7
+
+def atomic_write(path, chunks):
+    """Writes chunks to a temp file beside path, fsyncs it and renames it into place"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as fh:
+        for chunk in chunks:
+            fh.write(chunk)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+def write_segment(path, column):
+    """Writes a frozen IOCColumn as a segment file"""
+    sections = [(SEG_IPV4, 4, len(column.ipv4), column.ipv4.tobytes(), 0)]
+    for size in sorted(column.hashes):
+        blob = column.hashes[size]
+        sections.append((SEG_DIGEST, size, len(blob) // size, bytes(blob), 0))
+    for kind, values in ((SEG_STRINGS, column.strings), (SEG_HOSTS, sorted(set(filter(None, map(url_host, column.strings)))))):
+        encoded = [value.encode() for value in values]
+        offsets = array('I', accumulate(map(len, encoded), initial=0))
+        sections.append((kind, 0, len(encoded), offsets.tobytes() + b''.join(encoded), 0))
+    cidrs = sorted({network << 8 | prefix for network, prefix in filter(None, map(parse_cidr, column.strings))})
+    if cidrs:
+        mask = 0
+        for key in cidrs:
+            mask |= 1 << (key & 0xFF)
+        sections.append((SEG_CIDR, 8, len(cidrs), array('Q', cidrs).tobytes(), mask))
+    # The substring index, so workers search the mapping instead of rebuilding it each
+    search = column.search
+    sections.append((SEG_TEXT, 0, len(search.starts) - 1, search.starts.tobytes() + search.text[search.base:search.base + search.size], 0))
+    sections.append((SEG_GRAMS, 4, len(search.grams), search.grams.tobytes() + search.bounds.tobytes() + search.postings.tobytes(), len(search.postings)))
+    offset = SEGMENT_HEADER.size + SEGMENT_ENTRY.size * len(sections)
+    table, body = [SEGMENT_HEADER.pack(SEGMENT_MAGIC, len(sections), 0)], []
+    for kind, width, count, data, aux in sections:
+        pad = -offset % 8
+        offset += pad
+        table.append(SEGMENT_ENTRY.pack(kind, 0, width, count, offset, aux))
+        body += [b'\0' * pad, data]
+        offset += len(data)
+    atomic_write(path, table + body)
+
+def _search_blocks(count, probe, target):
+    """Binary search over `count` sorted byte values fetched by probe(i)"""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        value = probe(mid)
+        if value == target:
+            return True
+        if value < target:
+            lo = mid + 1
+        else:
+            hi = mid
+    return False
+
+class Segment:
+    """One memory-mapped segment file; membership is a binary search over the mapping.
+    Pages and iterates like a frozen IOCColumn, so a worker's unified view can use it."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._search = None
+        view = memoryview(self._map)
+        magic, count, _ = SEGMENT_HEADER.unpack_from(self._map)
+        if magic != SEGMENT_MAGIC:
+            raise ValueError(f"{path}: not a segment file")
+        self.ipv4 = view[0:0].cast('I')
+        self.digests = {}
+        self.offsets, self.blob = view[0:0].cast('I'), view[0:0]
+        self.host_offsets, self.host_blob = view[0:0].cast('I'), view[0:0]
+        self._host_ipv4 = None
+        self.cidrs, self.prefixes = view[0:0].cast('Q'), []
+        text = grams = None
+        for i in range(count):
+            kind, _, width, n, offset, aux = SEGMENT_ENTRY.unpack_from(self._map, SEGMENT_HEADER.size + i * SEGMENT_ENTRY.size)
+            if kind == SEG_IPV4:
+                self.ipv4 = view[offset:offset + 4 * n].cast('I')
+            elif kind == SEG_DIGEST:
+                self.digests[width] = view[offset:offset + width * n]
+            elif kind in (SEG_STRINGS, SEG_HOSTS):
+                offsets = view[offset:offset + 4 * (n + 1)].cast('I')
+                start = offset + 4 * (n + 1)
+                if kind == SEG_STRINGS:
+                    self.offsets, self.blob = offsets, view[start:start + offsets[n]]
+                else:
+                    self.host_offsets, self.host_blob = offsets, view[start:start + offsets[n]]
+            elif kind == SEG_CIDR:
+                self.cidrs = view[offset:offset + 8 * n].cast('Q')
+                self.prefixes = [prefix for prefix in range(33) if aux >> prefix & 1]
+            elif kind == SEG_TEXT:
+                starts = np.frombuffer(self._map, np.uint32, n + 1, offset)
+                text = self._map, offset + 4 * (n + 1), int(starts[n]), starts
+            elif kind == SEG_GRAMS:
+                grams = (np.frombuffer(self._map, np.uint32, n, offset), np.frombuffer(self._map, np.uint32, n + 1, offset + 4 * n),
+                         np.frombuffer(self._map, np.uint32, aux, offset + 4 * (2 * n + 1)))
+        if text is not None and grams is not None:
+            self._search = TextIndex.mapped(*text, *grams)
+
+    def __len__(self):
+        return len(self.ipv4) + sum(len(blob) // size for size, blob in self.digests.items()) + max(len(self.offsets) - 1, 0)
+
+    def __iter__(self):
+        for packed in self.ipv4:
+            yield int_to_ipv4(packed)
+        for size in sorted(self.digests):
+            blob = self.digests[size]
+            for i in range(0, len(blob), size):
+                yield blob[i:i + size].hex()
+        for i in range(len(self.offsets) - 1):
+            yield self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode()
+
+    def __getitem__(self, i):
+        """i-th value in iteration order, the same order as the IOCColumn it was written from"""
+        if i < len(self.ipv4):
+            return int_to_ipv4(self.ipv4[i])
+        i -= len(self.ipv4)
+        for size in sorted(self.digests):
+            count = len(self.digests[size]) // size
+            if i < count:
+                return self.digests[size][i * size:(i + 1) * size].hex()
+            i -= count
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode()
+
+    @property
+    def search(self):
+        """Substring index: the mapped one, or for files written without it, built here on first use"""
+        if self._search is None:
+            self._search = TextIndex(self)
+        return self._search
+
+    def __contains__(self, value):
+        """Membership of an already-normalized value"""
+        packed = ipv4_to_int(value)
+        if packed is not None:
+            i = bisect.bisect_left(self.ipv4, packed)
+            return i < len(self.ipv4) and self.ipv4[i] == packed
+        if HASH_RE.fullmatch(value):
+            digest = bytes.fromhex(value)
+            blob = self.digests.get(len(digest))
+            size = len(digest)
+            return blob is not None and _search_blocks(len(blob) // size, lambda i: blob[i * size:(i + 1) * size].tobytes(), digest)
+        offsets, blob = self.offsets, self.blob
+        return _search_blocks(len(offsets) - 1, lambda i: blob[offsets[i]:offsets[i + 1]].tobytes(), value.encode())
+
+    def serves(self, host):
+        """Whether any URL in this segment is on host"""
+        offsets, blob = self.host_offsets, self.host_blob
+        return _search_blocks(len(offsets) - 1, lambda i: blob[offsets[i]:offsets[i + 1]].tobytes(), host.encode())
+
+    @property
+    def host_ipv4(self):
+        """Sorted packed IPv4 URL hosts, for vectorized bulk screening"""
+        if self._host_ipv4 is None:
+            offsets, blob = self.host_offsets, self.host_blob
+            hosts = (ipv4_to_int(blob[offsets[i]:offsets[i + 1]].tobytes().decode()) for i in range(len(offsets) - 1))
+            self._host_ipv4 = np.array(sorted(filter(lambda packed: packed is not None, hosts)), dtype=np.uint32)
+        return self._host_ipv4
+
+    def containing(self, packed):
+        """CIDRs in this segment that contain the packed IPv4 address"""
+        found = []
+        for prefix in self.prefixes:
+            key = (packed & PREFIX_MASKS[prefix]) << 8 | prefix
+            i = bisect.bisect_left(self.cidrs, key)
+            if i < len(self.cidrs) and self.cidrs[i] == key:
+                found.append(f"{int_to_ipv4(packed & PREFIX_MASKS[prefix])}/{prefix}")
+        return found
+
+class SegmentSet:
+    """The segments of one manifest; answers lookups like CorrelationIndex"""
+
+    def __init__(self, manifest, segments):
+        self.version = manifest['version']
+        self.refreshed = manifest['refreshed']
+        self.names = manifest['segments']
+        self.segments = segments
+
+    def _listing(self, ioc):
+        """(feeds listing ioc, {cidr: feeds} for listed networks containing it)"""
+        packed = ipv4_to_int(ioc)
+        sources, ranges = [], {}
+        for key, segment in self.segments.items():
+            if ioc in segment:
+                sources.append(key)
+            if packed is not None:
+                for cidr in segment.containing(packed):
+                    ranges.setdefault(cidr, []).append(key)
+        return sources, ranges
+
+    def get(self, value):
+        """{'sources', 'count', 'first_seen', 'last_seen', 'hits', 'ranges', 'match'} or None;
+        match kinds as in CorrelationIndex._find"""
+        return self.match(normalize_ioc(value))
+
+    def match(self, ioc):
+        """get() for an already-normalized IOC"""
+        sources, ranges = self._listing(ioc)
+        kind = 'exact' if sources else 'range'
+        if not sources and not ranges:
+            host, kind = url_host(ioc), 'host'
+            if host is not None:
+                sources, ranges = self._listing(host)
+            else:
+                sources = [key for key, segment in self.segments.items() if segment.serves(ioc)]
+        return self._describe(sources, ranges, kind)
+
+    def _describe(self, sources, ranges, kind):
+        for keys in ranges.values():
+            sources += [key for key in keys if key not in sources]
+        if not sources:
+            return None
+        # Segments hold membership only; first seen comes from the feed store when there is one
+        last_seen = max(self.refreshed.get(key, 0) for key in sources)
+        stamp = datetime.fromtimestamp(last_seen, timezone.utc).isoformat()
+        return {'sources': sources, 'count': len(sources), 'first_seen': stamp, 'last_seen': stamp, 'hits': None,
+                'ranges': [{'cidr': cidr, 'sources': keys} for cidr, keys in ranges.items()], 'match': kind}
+
+    def match_many(self, iocs):
+        """Yields (ioc, record) for every normalized IOC in the batch the segments know.
+        IPv4 addresses are probed once per segment table with vectorized searchsorted and
+        their records built from those hits; other kinds go through match()"""
+        packed = [ipv4_to_int(ioc) for ioc in iocs]
+        where = [i for i, value in enumerate(packed) if value is not None]
+        exact, hosts, ranges = {}, {}, {}
+        if where:
+            values = np.fromiter((packed[i] for i in where), dtype=np.uint32, count=len(where))
+            for key, segment in self.segments.items():
+                for k in self._probe(np.frombuffer(segment.ipv4, np.uint32), values):
+                    exact.setdefault(k, []).append(key)
+                for k in self._probe(segment.host_ipv4, values):
+                    hosts.setdefault(k, []).append(key)
+                cidrs = np.frombuffer(segment.cidrs, np.uint64)
+                for prefix in segment.prefixes:
+                    networks = values & np.uint32(PREFIX_MASKS[prefix])
+                    for k in self._probe(cidrs, networks.astype(np.uint64) << np.uint64(8) | np.uint64(prefix)):
+                        cidr = f"{int_to_ipv4(int(networks[k]))}/{prefix}"
+                        ranges.setdefault(k, {}).setdefault(cidr, []).append(key)
+        found = {}
+        for k, i in enumerate(where):
+            if k in exact or k in ranges:
+                found[i] = self._describe(exact.get(k, []), ranges.get(k, {}), 'exact' if k in exact else 'range')
+            elif k in hosts:
+                found[i] = self._describe(hosts[k], {}, 'host')
+        for i, ioc in enumerate(iocs):
+            match = found.get(i) if packed[i] is not None else self.match(ioc)
+            if match:
+                yield ioc, match
+
+    @staticmethod
+    def _probe(table, keys):
+        """Positions in keys present in the sorted table; keys must share its dtype so numpy never casts the mapped table"""
+        if not len(table):
+            return []
+        return np.flatnonzero(table[np.searchsorted(table, keys).clip(max=len(table) - 1)] == keys).tolist()
+
+
+class SegmentDir:
+    """Reader side: the SegmentSet CURRENT points at. A request costs one stat() of
+    CURRENT; a new manifest is loaded only when it changes, and segments it
+    shares with the previous one stay mapped."""
+
+    def __init__(self, path):
+        self.path = path
+        self._stamp = None
+        self._set = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        """The latest SegmentSet; the previous one while a new manifest cannot be loaded yet"""
+        try:
+            stat = os.stat(os.path.join(self.path, 'CURRENT'))
+        except FileNotFoundError:
+            return self._set
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp:
+                    loaded = self._load()
+                    if loaded is not None:
+                        self._set, self._stamp = loaded, stamp
+        return self._set
+
+    def _load(self):
+        # The writer deletes the files of superseded manifests, so what CURRENT named
+        # can vanish between reading it and opening them; the next read names newer ones
+        for _ in range(SEGMENT_RETRIES):
+            try:
+                with open(os.path.join(self.path, 'CURRENT'), encoding='utf-8') as fh:
+                    name = fh.read().strip()
+                with open(os.path.join(self.path, name), encoding='utf-8') as fh:
+                    manifest = json.load(fh)
+                mapped = self._set.segments if self._set else {}
+                names = self._set.names if self._set else {}
+                segments = {key: mapped[key] if names.get(key) == file else Segment(os.path.join(self.path, file))
+                            for key, file in manifest['segments'].items()}
+                return SegmentSet(manifest, segments)
+            except FileNotFoundError:
+                continue
+        return None
+
+class SegmentWriter:
+    """Writer side: segments for the columns that changed, a manifest, then CURRENT.
+    Files the previous manifest still names are kept for readers mid-switch."""
+
+    def __init__(self, path):
+        self.path = path
+        self._written = {}      # feed key -> (column, file name)
+        # After a restart the manifest readers are on is whatever CURRENT names
+        self._previous = self._current_files()
+
+    def _current_files(self):
+        try:
+            with open(os.path.join(self.path, 'CURRENT'), encoding='utf-8') as fh:
+                name = fh.read().strip()
+            with open(os.path.join(self.path, name), encoding='utf-8') as fh:
+                return {name, *json.load(fh)['segments'].values()}
+        except (OSError, ValueError, KeyError):
+            return set()
+
+    def publish(self, version, columns, refreshed):
+        os.makedirs(self.path, exist_ok=True)
+        names = {}
+        for key, column in columns.items():
+            written = self._written.get(key)
+            if written is None or written[0] is not column:
+                written = (column, f"{key}-{uuid.uuid4().hex[:12]}.seg")
+                write_segment(os.path.join(self.path, written[1]), column)
+                self._written[key] = written
+            names[key] = written[1]
+        manifest = f"MANIFEST-{version}-{uuid.uuid4().hex[:8]}.json"
+        body = {'version': version, 'segments': names, 'refreshed': refreshed}
+        atomic_write(os.path.join(self.path, manifest), [json.dumps(body).encode()])
+        atomic_write(os.path.join(self.path, 'CURRENT'), [manifest.encode()])
+        live = set(names.values()) | {manifest, 'CURRENT'}
+        for name in os.listdir(self.path):
+            if name not in live and name not in self._previous and name.endswith(('.seg', '.json')):
+                os.remove(os.path.join(self.path, name))
+        self._previous = live
+
+SEGMENT_DIR = os.path.join(DATA_DIR, 'segments') if DATA_DIR else None
+SEGMENTS = SegmentDir(SEGMENT_DIR) if SEGMENT_DIR else None
 
 # --- MOCK DATA GENERATOR (Fallback) ---
+def mock_ioc(field, ips, domains):
+    """A plausible IOC for the row field a feed declares"""
+    if field == 'ip':
+        return random.choice(ips)
+    if field == 'url':
+        return f"http://{random.choice(domains)}/{random.choice(['payload.exe', 'login', 'panel', 'verify', 'dropper'])}"
+    if field in ('hash', 'sha1'):
+        return uuid.uuid4().hex + uuid.uuid4().hex[:8 if field == 'sha1' else 32]
+    if field == 'cveID':
+        return f"CVE-2024-{random.randint(1000, 99999)}"
+    return random.choice(domains)
+
 def generate_mock_data():
     """Generates realistic threat data when APIs fail"""
     print("⚠️  Live Feeds Unreachable. Switching to Simulation Mode.")
@@ -1203,257 +2509,1461 @@ def generate_mock_data():
     countries = ['CN', 'RU', 'US', 'IR', 'KP', 'BR']
     
     now = datetime.now(timezone.utc).isoformat()
-    
-    data = {
-        "simulation": True,
-        "sans": [{"ip": ip, "reports": random.randint(10, 5000), "country": random.choice(countries), "updated": now} for ip in mock_ips[:10]],
-        "urlhaus": [{"date": now, "url": f"http://{d}/payload.exe", "status": "online", "threat": "malware_download", "link": "#"} for d in mock_domains],
-        "threatfox": [{"date": now, "ioc": mock_ips[11], "threat_type": "botnet_cc", "malware": "Cobalt Strike", "reference": "#", "reporter": "admin"}],
-        "cisa": [{"dateAdded": now, "cveID": "CVE-2024-9999", "product": "Simulation OS", "shortDescription": "Critical RCE in kernel.", "requiredAction": "Patch immediately"}],
-        "feodo": [{"date": now, "ip": mock_ips[12], "port": "443", "malware": "Emotet"}],
-        "bazaar": [{"date": now, "hash": "a1b2c3d4e5f6...", "type": "exe", "signature": "Ransomware.LockBit", "link": "#"}],
-        "osint": [{"ioc": d} for d in mock_domains],
-        "openphish": [{"url": f"http://{d}/login"} for d in mock_domains],
-        "tor": [{"ip": ip, "date": now} for ip in mock_ips[13:18]],
-        "blocklist": [{"ip": ip, "date": now} for ip in mock_ips[19:25]],
-        "botvrij": [{"ip": ip, "date": now, "desc": "Botnet Node"} for ip in mock_ips[26:30]],
-        "greensnow": [{"ip": ip, "date": now} for ip in mock_ips[31:35]],
-        "vxvault": [{"url": f"http://{mock_domains[0]}/virus.zip", "date": now}],
-        "phishdb": [{"url": f"http://{mock_domains[1]}/secure", "date": now}],
-        "coinblocker": [{"domain": "miner.pool.com", "date": now}],
-        "et": [{"ip": mock_ips[36], "date": now}],
-        "sslbl": [{"date": now, "sha1": "123456789abcdef...", "reason": "Dridex Cert"}],
-        "binary": [{"ip": mock_ips[37], "date": now}],
-        "cins": [{"ip": mock_ips[38], "date": now}],
-        "spamhaus": [{"ip": mock_ips[39], "date": now}],
-        "bambenek": [{"ip": mock_ips[40], "date": now}],
-        "stopforum": [{"ip": mock_ips[41], "date": now}],
-        "darklist": [{"ip": mock_ips[42], "date": now}],
-        "proxies": [{"ip": mock_ips[43], "date": now}],
-        "cybercrime": [{"url": f"http://{mock_domains[2]}/panel", "date": now}],
-        "urlvir": [{"url": f"http://{mock_domains[3]}/dropper", "date": now}],
-        "phishstats": [{"url": f"http://{mock_domains[4]}/verify", "title": "Fake Login", "date": now}],
-        "mdl": [{"domain": "bad-site.com", "desc": "Malware Host", "date": now}],
-        "dga": [{"domain": "axbycz123.com", "desc": "Gameover Zeus", "date": now}],
-        "apache": [{"ip": mock_ips[44], "date": now}],
-        "mail": [{"ip": mock_ips[45], "date": now}],
-        "ftp": [{"ip": mock_ips[46], "date": now}],
-        "imap": [{"ip": mock_ips[47], "date": now}],
-        "sip": [{"ip": mock_ips[48], "date": now}],
-        "bots": [{"ip": mock_ips[49], "date": now}],
-        "cleanmx": [{"url": "http://virus-source.net/bin", "date": now}],
-        "cybercure": [{"ip": mock_ips[50], "date": now}],
-        "rutgers": [{"ip": mock_ips[51], "date": now}],
-        "nipr": [{"ip": mock_ips[52], "date": now}],
-        "uce": [{"ip": mock_ips[53], "date": now}]
+    # Fields the registry's display templates (and the map/vulns panels) read
+    fields = {
+        "reports": lambda: random.randint(10, 5000), "country": lambda: random.choice(countries),
+        "status": lambda: "online", "threat": lambda: "malware_download", "link": lambda: "#",
+        "threat_type": lambda: "botnet_cc", "malware": lambda: random.choice(["Cobalt Strike", "Emotet", "Dridex"]),
+        "reference": lambda: "#", "reporter": lambda: "admin", "port": lambda: "443", "type": lambda: "exe",
+        "signature": lambda: "Ransomware.LockBit", "product": lambda: "Simulation OS",
+        "shortDescription": lambda: "Critical RCE in kernel.", "requiredAction": lambda: "Patch immediately",
+        "desc": lambda: "Botnet Node", "title": lambda: "Fake Login",
     }
+    
+    data = {"simulation": True}
+    for key, spec in FEED_SPECS.items():
+        if spec.enabled:
+            data[key] = [dict({name: make() for name, make in fields.items()}, **{spec.field: mock_ioc(spec.field, mock_ips, mock_domains), spec.time: now})
+                         for _ in range(10 if spec.field == 'ip' else 5)]
     return data
 
 # --- BACKEND FETCHERS (Updated with Headers & Timeout Handling) ---
-
-def get_sans():
-    resp = fetch_with_timeout("https://isc.sans.edu/api/sources/attacks/20/?json")
-    if not resp: return []
-    try:
-        data = resp.json()
-        attacks = data if isinstance(data, list) else data.get('attacks', [])
-        return [{'ip': a.get('ip'), 'reports': a.get('reports'), 'country': a.get('country'), 'updated': a.get('updated', datetime.now(timezone.utc).isoformat())} for a in attacks]
-    except: return []
-
-def get_urlhaus():
-    resp = fetch_with_timeout("https://urlhaus.abuse.ch/feeds/recent/")
-    if not resp: return [], {}
-    try:
-        lines = [l for l in resp.text.splitlines() if not l.startswith('#')][:40]
-        processed = []
-        tags_list = []
+# Network, HTTP and parse errors propagate; FeedScheduler._fetch records them per feed
+
+def get_sans(url, limit=None, timeout=3, ingest=None):
+    resp = fetch_with_timeout(url, timeout)
+    data = resp.json()
+    attacks = data if isinstance(data, list) else data.get('attacks', [])
+    rows = ({'ip': a.get('ip'), 'reports': a.get('reports'), 'country': a.get('country'), 'updated': a.get('updated', datetime.now(timezone.utc).isoformat())} for a in attacks)
+    return take_rows(rows, 'ip', limit, ingest)
+
+def get_urlhaus(url, limit=40, timeout=3, ingest=None):
+    resp = fetch_with_timeout(url, timeout, stream=True)
+    tags = Counter()
+    def parse(lines):
         for l in lines:
             p = l.split('","')
             if len(p) > 7:
                 clean = [x.replace('"', '') for x in p]
-                processed.append({'date': clean[1], 'url': clean[2], 'status': clean[3], 'threat': clean[5], 'link': clean[7]})
-                tags_list.extend([t.strip() for t in clean[6].split(',') if t.strip()])
-        return processed, pd.Series(tags_list).value_counts().head(8).to_dict()
-    except: return [], {}
-
-def get_threatfox():
-    resp = fetch_with_timeout("https://threatfox.abuse.ch/export/csv/recent/")
-    if not resp: return []
-    try:
-        f = io.StringIO(resp.text)
-        reader = csv.reader(filter(lambda x: not x.startswith('#'), f))
-        processed = []
-        for i, row in enumerate(reader):
-            if i >= 30: break
-            if len(row) > 13:
-                processed.append({'date': row[0], 'ioc': row[2], 'threat_type': row[4], 'malware': row[7], 'reference': row[10], 'reporter': row[13]})
-        return processed
-    except: return []
-
-def get_feodo():
-    resp = fetch_with_timeout("https://feodotracker.abuse.ch/downloads/ipblocklist.json")
-    if not resp: return []
-    try:
-        data = resp.json()
-        processed = []
-        for item in data[:30]:
-            processed.append({'date': item.get('first_seen_utc'), 'ip': item.get('ip_address'), 'port': item.get('dst_port'), 'malware': item.get('malware')})
-        return processed
-    except: return []
-
-def get_bazaar():
-    resp = fetch_with_timeout("https://bazaar.abuse.ch/export/csv/recent/")
-    if not resp: return []
-    try:
-        lines = [l for l in resp.text.splitlines() if not l.startswith('#')][:30]
-        processed = []
+                tags.update(t.strip() for t in clean[6].split(',') if t.strip())
+                yield {'date': clean[1], 'url': clean[2], 'status': clean[3], 'threat': clean[5], 'link': clean[7]}
+    with streamed(resp):
+        processed = take_rows(parse(l for l in stream_lines(resp) if not l.startswith('#')), 'url', limit, ingest)
+    return processed, dict(tags.most_common(8))
+
+def get_threatfox(url, limit=30, timeout=3, ingest=None):
+    resp = fetch_with_timeout(url, timeout, stream=True)
+    with streamed(resp):
+        reader = csv.reader(filter(lambda x: not x.startswith('#'), stream_lines(resp)))
+        rows = ({'date': row[0], 'ioc': row[2], 'threat_type': row[4], 'malware': row[7], 'reference': row[10], 'reporter': row[13]} for row in reader if len(row) > 13)
+        return take_rows(rows, 'ioc', limit, ingest)
+
+def get_feodo(url, limit=30, timeout=3, ingest=None):
+    resp = fetch_with_timeout(url, timeout)
+    data = resp.json()
+    rows = ({'date': item.get('first_seen_utc'), 'ip': item.get('ip_address'), 'port': item.get('dst_port'), 'malware': item.get('malware')} for item in data)
+    return take_rows(rows, 'ip', limit, ingest)
+
+def get_bazaar(url, limit=30, timeout=3, ingest=None):
+    resp = fetch_with_timeout(url, timeout, stream=True)
+    def parse(lines):
         for l in lines:
             p = l.split('","')
             if len(p) > 8:
                 clean = [x.replace('"', '') for x in p]
-                processed.append({'date': clean[0], 'hash': clean[1], 'type': clean[2], 'size': clean[3], 'signature': clean[4], 'link': f"https://bazaar.abuse.ch/sample/{clean[1]}/"})
-        return processed
-    except: return []
+                yield {'date': clean[0], 'hash': clean[1], 'type': clean[2], 'size': clean[3], 'signature': clean[4], 'link': f"https://bazaar.abuse.ch/sample/{clean[1]}/"}
+    with streamed(resp):
+        return take_rows(parse(l for l in stream_lines(resp) if not l.startswith('#')), 'hash', limit, ingest)
 
-def get_cisa_kev():
-    resp = fetch_with_timeout("https://www.cisa.gov/sites/default/files/feeds/known_exploited_vulnerabilities.json")
-    if not resp: return []
-    try:
-        data = resp.json()
-        vulns = data.get('vulnerabilities', [])
-        vulns.sort(key=lambda x: x['dateAdded'], reverse=True)
-        return vulns[:20]
-    except: return []
+def get_cisa_kev(url, limit=20, timeout=3, ingest=None):
+    resp = fetch_with_timeout(url, timeout)
+    data = resp.json()
+    vulns = data.get('vulnerabilities', [])
+    vulns.sort(key=lambda x: x['dateAdded'], reverse=True)
+    return take_rows(iter(vulns), 'cveID', limit, ingest)
 
 # Simple Text List Fetchers
-def get_text_list(url, key_name, limit=30, parse_func=None):
-    resp = fetch_with_timeout(url)
-    if not resp: return []
-    try:
-        lines = [l.strip() for l in resp.text.splitlines() if l.strip() and not l.startswith(('#', ';', '<'))]
-        processed = []
-        now = datetime.now(timezone.utc).isoformat()
-        for l in lines[:limit]:
-            if parse_func:
-                val = parse_func(l)
-                if val: processed.append({key_name: val, "date": now})
-            else:
-                processed.append({key_name: l, "date": now})
-        return processed
-    except: return []
+def split_column(line, column):
+    """Field `index` of a `(sep, index)` column spec; None if the line lacks it"""
+    sep, index = column
+    parts = line.split(sep)
+    return parts[index].strip().strip('"') if len(parts) > max(index, 1) else None
+
+def get_text_list(url, key_name, column=None, limit=30, timeout=3, ingest=None):
+    # Streams the body and stops reading after `limit` entries, so memory and
+    # download time stay flat however large the upstream list is
+    resp = fetch_with_timeout(url, timeout, stream=True)
+    now = datetime.now(timezone.utc).isoformat()
+    with streamed(resp):
+        lines = (l.strip() for l in stream_lines(resp) if l.strip() and not l.startswith(('#', ';', '<')))
+        values = (split_column(l, column) if column else l for l in lines)
+        return take_rows(({key_name: val, "date": now} for val in values if val), key_name, limit, ingest)
 
-def get_mdl():
+def get_mdl(url, limit=30, timeout=3, ingest=None):
     """Malware Domain List (CSV)"""
-    resp = fetch_with_timeout("http://www.malwaredomainlist.com/mdlcsv.php")
-    if not resp: return []
-    try:
-        lines = [l for l in resp.text.splitlines() if l.strip()]
-        processed = []
-        now = datetime.now(timezone.utc).isoformat()
-        for l in lines[:30]:
+    resp = fetch_with_timeout(url, timeout, stream=True)
+    now = datetime.now(timezone.utc).isoformat()
+    def parse(lines):
+        for l in lines:
             parts = l.split('","')
             if len(parts) > 4:
                 domain = parts[1].replace('"', '')
                 desc = parts[4].replace('"', '')
-                processed.append({"domain": domain, "desc": desc, "date": now})
-        return processed
-    except: return []
+                yield {"domain": domain, "desc": desc, "date": now}
+    with streamed(resp):
+        return take_rows(parse(l for l in stream_lines(resp) if l.strip()), 'domain', limit, ingest)
+
+# --- FEED REGISTRY ---
+# One declaration per feed drives everything else: the scheduler, cache and
+# correlation index (FEEDS), the unified view (FEED_PROFILES), the dashboard
+# metric cards and the simulation data. register_feed() declares a feed or
+# overrides fields of one; FEEDS_FILE (JSON, {key: {field: value}}) is applied
+# on top of the defaults below, so retuning or dropping a feed is a config change.
+#   url/parser/field    where it lives, which PARSERS entry reads it, the row field holding the IOC
+#   column              text feeds: (separator, index) of the IOC within each line
+#   source...time       how it shows in the Omni-Intel view: label, category, risk score,
+#                       str.format templates over the row for type/details/link,
+#                       badge/icon/colour classes and the row's timestamp field
+#   metrics             dashboard metric cards the feed's IOCs count towards
+#   interval/ttl        refresh every `interval` seconds, served from FEED_CACHE within `ttl`
+#   timeout/limit       per-request timeout (seconds) and rows kept per page
+#   enabled             False drops the feed entirely
+FeedSpec = namedtuple('FeedSpec', 'url parser field source category risk type details link badge icon color time '
+                                  'metrics interval ttl timeout limit column enabled',
+                      defaults=('date', (), 1800, 120, 3, 30, None, True))
+
+# Every feed refreshes in the background on its own interval; requests only
+# ever read the last published snapshot
+Feed = namedtuple('Feed', 'fetch args interval ttl timeout limit')
+FeedProfile = namedtuple('FeedProfile', 'source category risk field type details link badge icon color time metrics')
+
+PARSERS = {
+    'sans': get_sans, 'urlhaus': get_urlhaus, 'threatfox': get_threatfox, 'feodo': get_feodo,
+    'bazaar': get_bazaar, 'cisa_kev': get_cisa_kev, 'mdl': get_mdl, 'text': get_text_list,
+}
+
+FEED_SPECS = {}
+FEEDS = {}
+FEED_PROFILES = {}
+
+def register_feed(key, **fields):
+    """Declares feed `key`, or overrides the given fields of an existing declaration"""
+    spec = FEED_SPECS[key]._replace(**fields) if key in FEED_SPECS else FeedSpec(**fields)
+    if spec.parser not in PARSERS:
+        raise ValueError(f"Feed {key!r}: unknown parser {spec.parser!r}")
+    if spec.enabled and key not in FEEDS and len(FEEDS) >= MAX_FEEDS:
+        raise ValueError(f"Feed {key!r}: at most {MAX_FEEDS} feeds can be enabled")
+    FEED_SPECS[key] = spec
+    FEEDS.pop(key, None)
+    FEED_PROFILES.pop(key, None)
+    if spec.enabled:
+        args = (spec.url, spec.field, tuple(spec.column) if spec.column else None) if spec.parser == 'text' else (spec.url,)
+        FEEDS[key] = Feed(PARSERS[spec.parser], args, spec.interval, spec.ttl, spec.timeout, spec.limit)
+        FEED_PROFILES[key] = FeedProfile(spec.source, spec.category, spec.risk, spec.field, spec.type, spec.details,
+                                         spec.link, spec.badge, spec.icon, spec.color, spec.time, tuple(spec.metrics))
+    return spec
+
+def load_feed_config(path):
+    """Applies a JSON feed file: {key: {field: value, ...}, ...}"""
+    with open(path, encoding='utf-8') as fh:
+        config = json.load(fh)
+    for key, fields in config.items():
+        register_feed(key, **fields)
+
+register_feed('sans', url='https://isc.sans.edu/api/sources/attacks/20/?json', parser='sans', field='ip',
+              source='SANS ISC', category='network', risk=5, type='Network Scan', details='{reports} Reports ({country})', link='https://isc.sans.edu/ipinfo.html?ip={ip}',
+              badge='src-sans', icon='fas fa-network-wired', color='text-red-400', time='updated', metrics=('network',), interval=300, limit=20)
+register_feed('urlhaus', url='https://urlhaus.abuse.ch/feeds/recent/', parser='urlhaus', field='url',
+              source='URLhaus', category='malware', risk=8, type='Malware URL', details='{threat} ({status})', link='{link}',
+              badge='src-urlhaus', icon='fas fa-link', color='text-blue-400', metrics=('malware',), interval=300, limit=40)
+register_feed('threatfox', url='https://threatfox.abuse.ch/export/csv/recent/', parser='threatfox', field='ioc',
+              source='ThreatFox', category='botnet', risk=9, type='{threat_type}', details='{malware} (@{reporter})', link='{reference}',
+              badge='src-threatfox', icon='fas fa-brain', color='text-purple-400', metrics=('botnet',), interval=300)
+register_feed('feodo', url='https://feodotracker.abuse.ch/downloads/ipblocklist.json', parser='feodo', field='ip',
+              source='Feodo Tracker', category='botnet', risk=9, type='Botnet C2', details='{malware} (Port {port})', link='https://feodotracker.abuse.ch/browse/ip/{ip}/',
+              badge='src-feodo', icon='fas fa-robot', color='text-yellow-400', metrics=('botnet',), interval=900)
+register_feed('bazaar', url='https://bazaar.abuse.ch/export/csv/recent/', parser='bazaar', field='hash',
+              source='MalwareBazaar', category='malware', risk=8, type='{type}', details='{signature}', link='{link}',
+              badge='src-bazaar', icon='fas fa-file-code', color='text-green-400', metrics=('hashes',), interval=300)
+register_feed('cisa', url='https://www.cisa.gov/sites/default/files/feeds/known_exploited_vulnerabilities.json', parser='cisa_kev', field='cveID',
+              source='CISA KEV', category='all', risk=10, type='Exploited Vuln', details='{product}', link='https://nvd.nist.gov/vuln/detail/{cveID}',
+              badge='src-cisa', icon='fas fa-shield-virus', color='text-orange-400', time='dateAdded', metrics=('cves',), interval=3600, ttl=3600, limit=20)
+register_feed('osint', url='https://osint.digitalside.it/threat-intel/lists/latestdomains.txt', parser='text', field='ioc',
+              source='DigitalSide', category='malware', risk=5, type='OSINT Domain', details='Malicious Domain List', link='#',
+              badge='src-osint', icon='fas fa-eye', color='text-indigo-400', metrics=('malware', 'osint'))
+register_feed('openphish', url='https://openphish.com/feed.txt', parser='text', field='url',
+              source='OpenPhish', category='phishing', risk=7, type='Phishing URL', details='Detected Phishing Site', link='{url}',
+              badge='src-openphish', icon='fas fa-fish', color='text-pink-400', metrics=('phishing',), interval=600)
+register_feed('tor', url='https://check.torproject.org/torbulkexitlist', parser='text', field='ip',
+              source='Tor Exit', category='all', risk=3, type='Anonymizer', details='Tor Exit Node', link='https://metrics.torproject.org/rs.html#search/{ip}',
+              badge='src-tor', icon='fas fa-user-secret', color='text-slate-400', metrics=('anonymizers',))
+register_feed('blocklist', url='https://lists.blocklist.de/lists/ssh.txt', parser='text', field='ip',
+              source='Blocklist.de', category='network', risk=6, type='SSH Brute Force', details='Aggressive Scanner', link='https://lists.blocklist.de/lists/ssh.txt',
+              badge='src-blocklist', icon='fas fa-key', color='text-red-500', metrics=('bruteforce',), interval=900)
+register_feed('botvrij', url='https://www.botvrij.eu/data/ioclist.ip-v4', parser='text', field='ip',
+              source='Botvrij.eu', category='botnet', risk=7, type='Open Botnet', details='{desc}', link='https://www.botvrij.eu',
+              badge='src-botvrij', icon='fas fa-robot', color='text-teal-400', metrics=('botnet',), interval=3600, ttl=3600)
+register_feed('greensnow', url='https://blocklist.greensnow.co/greensnow.txt', parser='text', field='ip',
+              source='GreenSnow', category='network', risk=6, type='Mass Brute Force', details='Attack Source', link='https://blocklist.greensnow.co/',
+              badge='src-greensnow', icon='fas fa-snowflake', color='text-lime-400', metrics=('bruteforce',), interval=900)
+register_feed('vxvault', url='http://vxvault.net/URL_List.php', parser='text', field='url',
+              source='VX Vault', category='malware', risk=9, type='Malware URL', details='High Conf. Malware', link='http://vxvault.net/URL_List.php',
+              badge='src-vxvault', icon='fas fa-bug', color='text-fuchsia-400', metrics=('malware',))
+register_feed('phishdb', url='https://raw.githubusercontent.com/mitchellkrogza/Phishing.Database/master/phishing-links-NEW-today.txt', parser='text', field='url',
+              source='Phishing.Database', category='phishing', risk=8, type='Phishing URL', details='Fresh Phish', link='https://github.com/mitchellkrogza/Phishing.Database',
+              badge='src-phishdb', icon='fas fa-fish', color='text-rose-400', metrics=('phishing',))
+register_feed('coinblocker', url='https://raw.githubusercontent.com/ZeroDot1/CoinBlockerLists/master/list_browser.txt', parser='text', field='domain',
+              source='CoinBlocker', category='crypto', risk=4, type='Crypto Mining', details='Cryptojacking Domain', link='https://zerodot1.gitlab.io/CoinBlockerListsWeb/',
+              badge='src-coin', icon='fas fa-coins', color='text-yellow-300', metrics=('crypto',), interval=3600, ttl=3600)
+register_feed('et', url='https://rules.emergingthreats.net/blockrules/compromised-ips.txt', parser='text', field='ip',
+              source='EmergingThreats', category='malware', risk=7, type='Compromised Host', details='ET Block Rules', link='https://rules.emergingthreats.net',
+              badge='src-et', icon='fas fa-skull', color='text-pink-400', metrics=('malware',))
+register_feed('sslbl', url='https://sslbl.abuse.ch/blacklist/sslblacklist.csv', parser='text', field='sha1', column=(',', 1),
+              source='SSL Blacklist', category='botnet', risk=8, type='Malicious Cert', details='Abuse.ch SSLBL', link='https://sslbl.abuse.ch',
+              badge='src-sslbl', icon='fas fa-lock', color='text-teal-300', metrics=('botnet',), interval=900)
+register_feed('binary', url='https://www.binarydefense.com/banlist.txt', parser='text', field='ip',
+              source='BinaryDefense', category='network', risk=6, type='Artillery Ban', details='Known Attacker', link='https://www.binarydefense.com',
+              badge='src-binary', icon='fas fa-shield-alt', color='text-indigo-300', metrics=('network',))
+register_feed('cins', url='http://cinsscore.com/list/ci-badguys.txt', parser='text', field='ip',
+              source='CINS Army', category='network', risk=7, type='Bad Reputation', details='Sentinel/CI-BadGuys', link='http://cinsscore.com',
+              badge='src-cins', icon='fas fa-fighter-jet', color='text-red-300', metrics=('network',))
+register_feed('spamhaus', url='https://www.spamhaus.org/drop/drop.txt', parser='text', field='ip', column=(';', 0),
+              source='Spamhaus DROP', category='network', risk=9, type='Cybercrime Net', details="Don't Route/Peer", link='https://www.spamhaus.org/drop/',
+              badge='src-spamhaus', icon='fas fa-ban', color='text-slate-300', metrics=('network',), interval=3600, ttl=3600)
+register_feed('bambenek', url='http://osint.bambenekconsulting.com/feeds/c2-ipmasterlist.txt', parser='text', field='ip', column=(',', 0),
+              source='Bambenek C2', category='botnet', risk=10, type='C2 Masterlist', details='Known Command & Control', link='http://osint.bambenekconsulting.com/feeds/',
+              badge='src-bambenek', icon='fas fa-server', color='text-fuchsia-400', metrics=('botnet',))
+register_feed('stopforum', url='https://www.stopforumspam.com/downloads/toxic_ip_cidr.txt', parser='text', field='ip',
+              source='StopForumSpam', category='network', risk=5, type='Toxic IP', details='Forum Spammer', link='https://www.stopforumspam.com',
+              badge='src-stopforum', icon='fas fa-comment-slash', color='text-orange-300', metrics=('network',), interval=3600)
+register_feed('darklist', url='https://darklist.de/raw.php', parser='text', field='ip',
+              source='Darklist.de', category='network', risk=6, type='SSH/HTTP Attack', details='Darklist Aggregated', link='https://darklist.de',
+              badge='src-darklist', icon='fas fa-spider', color='text-slate-400', metrics=('network',))
+register_feed('proxies', url='https://raw.githubusercontent.com/TheSpeedX/SOCKS-List/master/socks5.txt', parser='text', field='ip', column=(':', 0),
+              source='Open Proxies', category='all', risk=4, type='Open Proxy', details='Socks4/5 Anonymizer', link='#',
+              badge='src-proxy', icon='fas fa-mask', color='text-teal-300', metrics=('anonymizers',))
+register_feed('cybercrime', url='https://cybercrime-tracker.net/all.php', parser='text', field='url',
+              source='CyberCrime-Tracker', category='botnet', risk=10, type='C2 Panel', details='Botnet Controller', link='https://cybercrime-tracker.net',
+              badge='src-cybercrime', icon='fas fa-network-wired', color='text-purple-400', metrics=('botnet',))
+register_feed('urlvir', url='http://www.urlvir.com/export-hosts/', parser='text', field='url',
+              source='URLVir', category='malware', risk=7, type='Malware Link', details='URLVir Feed', link='http://www.urlvir.com/',
+              badge='src-urlvir', icon='fas fa-link', color='text-pink-400', metrics=('malware',))
+register_feed('phishstats', url='https://phishstats.info/phish_score.csv', parser='text', field='url', column=(',', 2),
+              source='PhishStats', category='phishing', risk=8, type='Phishing', details='{title}', link='https://phishstats.info',
+              badge='src-phishstats', icon='fas fa-fish', color='text-rose-400', metrics=('phishing',), interval=900)
+register_feed('mdl', url='http://www.malwaredomainlist.com/mdlcsv.php', parser='mdl', field='domain',
+              source='MalwareDomainList', category='malware', risk=8, type='Malware Domain', details='{desc}', link='http://www.malwaredomainlist.com/mdl.php',
+              badge='src-mdl', icon='fas fa-skull-crossbones', color='text-purple-300', metrics=('malware',), interval=3600)
+register_feed('dga', url='http://osint.bambenekconsulting.com/feeds/dga-feed.txt', parser='text', field='domain', column=(',', 0),
+              source='Bambenek DGA', category='botnet', risk=9, type='DGA Domain', details='{desc}', link='http://osint.bambenekconsulting.com/feeds/',
+              badge='src-dga', icon='fas fa-random', color='text-yellow-200', metrics=('botnet',))
+register_feed('apache', url='https://lists.blocklist.de/lists/apache.txt', parser='text', field='ip',
+              source='Blocklist.de Apache', category='network', risk=7, type='Apache Attack', details='Web Exploit', link='https://lists.blocklist.de/lists/apache.txt',
+              badge='src-apache', icon='fas fa-server', color='text-rose-300', metrics=('network',), interval=900)
+register_feed('mail', url='https://lists.blocklist.de/lists/mail.txt', parser='text', field='ip',
+              source='Blocklist.de Mail', category='network', risk=6, type='Mail Server Attack', details='Postfix/Exim Brute', link='https://lists.blocklist.de/lists/mail.txt',
+              badge='src-blocklist', icon='fas fa-envelope', color='text-orange-400', metrics=('network',), interval=900)
+register_feed('ftp', url='https://lists.blocklist.de/lists/ftp.txt', parser='text', field='ip',
+              source='Blocklist.de FTP', category='network', risk=5, type='FTP Attack', details='FTP Brute Force', link='https://lists.blocklist.de/lists/ftp.txt',
+              badge='src-blocklist', icon='fas fa-file-upload', color='text-amber-400', metrics=('network',), interval=900)
+register_feed('imap', url='https://lists.blocklist.de/lists/imap.txt', parser='text', field='ip',
+              source='Blocklist.de IMAP', category='network', risk=5, type='IMAP Attack', details='Email Access Brute', link='https://lists.blocklist.de/lists/imap.txt',
+              badge='src-blocklist', icon='fas fa-inbox', color='text-yellow-500', metrics=('network',), interval=900)
+register_feed('sip', url='https://lists.blocklist.de/lists/sip.txt', parser='text', field='ip',
+              source='Blocklist.de SIP', category='network', risk=6, type='SIP Attack', details='VoIP Gateway Abuse', link='https://lists.blocklist.de/lists/sip.txt',
+              badge='src-blocklist', icon='fas fa-phone-slash', color='text-red-400', metrics=('network',), interval=900)
+register_feed('bots', url='https://lists.blocklist.de/lists/bots.txt', parser='text', field='ip',
+              source='Blocklist.de Bots', category='botnet', risk=8, type='RFI/Bot', details='Remote File Inclusion', link='https://lists.blocklist.de/lists/bots.txt',
+              badge='src-blocklist', icon='fas fa-robot', color='text-fuchsia-500', metrics=('botnet',), interval=900)
+register_feed('cleanmx', url='http://lists.clean-mx.com/pipermail/viruswatch/', parser='text', field='url',
+              source='CleanMX', category='malware', risk=9, type='Virus/Malware', details='CleanMX VirusWatch', link='http://lists.clean-mx.com/pipermail/viruswatch/',
+              badge='src-cleanmx', icon='fas fa-virus', color='text-teal-400', metrics=('malware',), interval=3600)
+register_feed('cybercure', url='http://api.cybercure.ai/feed/get_ips', parser='text', field='ip',
+              source='CyberCure', category='network', risk=7, type='Malicious IP', details='CyberCure Intel', link='http://api.cybercure.ai/feed/get_ips',
+              badge='src-cybercure', icon='fas fa-biohazard', color='text-rose-400', metrics=('network',), interval=3600)
+register_feed('rutgers', url='https://report.cs.rutgers.edu/DROP/attackers', parser='text', field='ip',
+              source='Rutgers', category='network', risk=6, type='Bad Actor', details='Rutgers Blacklist', link='https://report.cs.rutgers.edu/DROP/attackers',
+              badge='src-rutgers', icon='fas fa-university', color='text-purple-400', metrics=('network',))
+register_feed('nipr', url='https://raw.githubusercontent.com/firehol/blocklist-ipsets/master/nipr_iscs.ipset', parser='text', field='ip',
+              source='NIPR', category='network', risk=8, type='DoD Blocklist', details='NIPR Intrusion', link='#',
+              badge='src-nipr', icon='fas fa-shield-alt', color='text-blue-400', metrics=('network',), interval=3600, ttl=3600)
+register_feed('uce', url='http://wget-mirrors.uceprotect.net/rbldnsd-all/dnsbl-1.uceprotect.net.gz', parser='text', field='ip',
+              source='UCEPROTECT', category='network', risk=5, type='L1 Spammer', details='UCEPROTECT Level 1', link='http://www.uceprotect.net',
+              badge='src-uce', icon='fas fa-mail-bulk', color='text-yellow-400', metrics=('network',), interval=3600)
+
+if os.path.exists(FEEDS_FILE):
+    load_feed_config(FEEDS_FILE)
+
+# --- UNIFIED VIEW ---
+# The Omni-Intel table: every feed joined into one list that is filtered,
+# searched, sorted and paged here, so the browser only ever holds one page.
+# Page rows are rendered once per snapshot; in full-feed mode the rest of a
+# feed stays in its IOC column and only becomes rows when a page reaches it.
+RADAR_RULES = (('Malware', ('malware', 'hash', 'compromised', 'virus')), ('Phishing', ('phish',)),
+               ('Botnets', ('botnet', 'cert', 'c2', 'bot')), ('Crypto', ('crypto',)))
+
+def radar_bucket(ioc_type):
+    t = ioc_type.lower()
+    return next((label for label, words in RADAR_RULES if any(w in t for w in words)), 'Scanners')
+
+def parse_time(value):
+    """Epoch seconds for the ISO-style timestamps feeds use, 0 if unparseable"""
+    try:
+        stamp = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    except ValueError:
+        return 0.0
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return stamp.timestamp()
+
+class RowFields(dict):
+    """Row fields for the display templates; fields a row lacks render empty"""
+    def __missing__(self, key):
+        return ''
+
+def unified_row(key, profile, item, row_id, fetched_at):
+    fields = RowFields(item)
+    return {
+        'id': row_id, 'feed': key, 'source': profile.source, 'category': profile.category, 'risk': profile.risk,
+        'correlated': item.get('correlated', False), 'sources': item.get('sources', [key]),
+        'rawTime': item.get(profile.time) or fetched_at, 'ioc': str(item.get(profile.field) or ''),
+        'type': profile.type.format_map(fields), 'details': profile.details.format_map(fields),
+        'link': profile.link.format_map(fields) or '#',
+        'badgeClass': profile.badge, 'icon': profile.icon, 'colorClass': profile.color,
+    }
+
+def search_text(row):
+    return '\0'.join((row['ioc'], row['type'], row['source'], row['details'])).lower()
+
+class RestBlock:
+    """A full-feed column minus the IOCs already on the feed's first page"""
+
+    def __init__(self, key, profile, column, skip, shared, fetched_at):
+        self.key, self.profile, self.column, self.skip, self.fetched_at = key, profile, column, skip, fetched_at
+        # Feed-level text every row shares; a query hitting it matches the whole block
+        self.text = '\0'.join((profile.type, profile.source, profile.details)).lower()
+        self.shared = sorted(ioc for ioc in shared if ioc in column and ioc not in skip)
+
+    def __len__(self):
+        return len(self.column) - len(self.skip)
+
+    def scan(self, start, q, correlated):
+        """Yields (position, ioc) from `start` on; positions index the list being filtered"""
+        if correlated:
+            for j in range(start, len(self.shared)):
+                if not q or q in self.text or q in self.shared[j].lower():
+                    yield j, self.shared[j]
+            return
+        positions = range(start, len(self.column)) if not q or q in self.text else self.column.search.find(q, start)
+        for j in positions:
+            ioc = self.column[j]
+            if ioc not in self.skip:
+                yield j, ioc
+
+    def count(self, q, correlated):
+        if correlated:
+            return sum(1 for ioc in self.shared if not q or q in self.text or q in ioc.lower())
+        if not q or q in self.text:
+            return len(self)
+        # skip only holds IOCs of this column, so drop the ones the query matches
+        return self.column.search.count(q) - sum(1 for ioc in self.skip if q in ioc.lower())
+
+    def row(self, ioc):
+        match = lookup_index().get(ioc)
+        item = {self.profile.field: ioc}
+        if match and match['count'] > 1:
+            item.update(correlated=True, sources=match['sources'])
+        return unified_row(self.key, self.profile, item, f"{self.key}#{ioc}", self.fetched_at)
+
+ViewEntry = namedtuple('ViewEntry', 'ts profile row text rest')
+
+VIEW_ORDERS = {
+    'time': lambda entry: -entry.ts,
+    'risk': lambda entry: (-entry.profile.risk, -entry.ts),
+    'source': lambda entry: (entry.profile.source, -entry.ts),
+}
+
+class UnifiedView:
+    """Every feed's rows as one queryable list, built once per snapshot"""
+
+    def __init__(self, data, columns=None, fetched_at=None, shared=None):
+        columns, fetched_at = columns or {}, fetched_at or {}
+        now = datetime.now(timezone.utc).isoformat()
+        if shared is None:
+            shared = CORRELATION.shared_by_feed() if columns else {}
+        self.entries = []
+        for key, profile in FEED_PROFILES.items():
+            rows = data.get(key)
+            if not isinstance(rows, list):
+                continue
+            seen = fetched_at.get(key, now)
+            oldest = parse_time(seen)
+            for i, item in enumerate(rows):
+                row = unified_row(key, profile, item, f"{key}:{i}", seen)
+                entry = ViewEntry(parse_time(row['rawTime']), profile, row, search_text(row), None)
+                oldest = min(oldest, entry.ts)
+                self.entries.append(entry)
+            column = columns.get(key)
+            if column is not None and len(column) > len(rows):
+                skip = {ioc for ioc in normalize_iocs([row_ioc(item) or '' for item in rows]) if ioc in column}
+                rest = RestBlock(key, profile, column, skip, shared.get(key, ()), seen)
+                # Feeds page their newest rows first, so the rest sorts after the page
+                if len(rest):
+                    self.entries.append(ViewEntry(oldest, profile, None, None, rest))
+        self._orders = {}
+
+    def _ordered(self, sort):
+        if sort not in self._orders:
+            self._orders[sort] = sorted(self.entries, key=VIEW_ORDERS[sort])
+        return self._orders[sort]
+
+    @staticmethod
+    def _feed_matches(profile, source, category):
+        return source in ('all', profile.source) and category in ('all', profile.category)
+
+    def query(self, source='all', category='all', correlated=False, q='', sort='time', start=(0, 0), limit=PAGE_SIZE):
+        """(rows, next position or None) for one page of the filtered list"""
+        entries, q = self._ordered(sort), q.lower()
+        items = []
+        i, j = start
+        while i < len(entries):
+            entry = entries[i]
+            if self._feed_matches(entry.profile, source, category):
+                if entry.rest is None:
+                    if (not correlated or entry.row['correlated']) and (not q or q in entry.text):
+                        if len(items) == limit:
+                            return items, (i, 0)
+                        items.append(entry.row)
+                else:
+                    for j, ioc in entry.rest.scan(j, q, correlated):
+                        if len(items) == limit:
+                            return items, (i, j)
+                        items.append(entry.rest.row(ioc))
+            i, j = i + 1, 0
+        return items, None
+
+    def holds(self, start, sort='time'):
+        """Whether (entry, offset) is a position query() could have returned for this sort"""
+        entries, (i, j) = self._ordered(sort), start
+        if i >= len(entries):
+            return i == len(entries) and j == 0
+        rest = entries[i].rest
+        return j == 0 or (rest is not None and j <= len(rest.column))
+
+    def count(self, source='all', category='all', correlated=False, q=''):
+        """Total rows matching the filters"""
+        q, total = q.lower(), 0
+        for entry in self.entries:
+            if not self._feed_matches(entry.profile, source, category):
+                continue
+            if entry.rest is None:
+                total += (not correlated or entry.row['correlated']) and (not q or q in entry.text)
+            else:
+                total += entry.rest.count(q, correlated)
+        return total
+
+    def summary(self):
+        """Headline numbers for the dashboard: totals, correlated rows, sources, metric cards and the radar"""
+        radar, cards = Counter(), Counter()
+        for entry in self.entries:
+            if entry.rest is None:
+                size = 1
+                radar[radar_bucket(entry.row['type'])] += 1
+            else:
+                size = len(entry.rest)
+                radar[radar_bucket(entry.profile.type.format_map(RowFields()))] += size
+            for card in entry.profile.metrics:
+                cards[card] += size
+        return {
+            'total': self.count(),
+            'correlated': self.count(correlated=True),
+            'sources': sorted({entry.profile.source for entry in self.entries}),
+            'metrics': dict(cards),
+            'radar': {label: radar[label] for label in ('Malware', 'Phishing', 'Botnets', 'Crypto', 'Scanners')},
+        }
+
+# --- SNAPSHOT BUILDER ---
+Snapshot = namedtuple('Snapshot', 'version generated_at data view encoded')
+
+def build_snapshot(feed_results, version, totals=None, index=None):
+    """Turns the latest per-feed results into the /api/data payload"""
+    results = dict(feed_results)
+    has_data = any(has_rows(res) for res in results.values())
+
+    # --- AUTO-FAILOVER TO MOCK DATA ---
+    if not has_data:
+        results = generate_mock_data()
+        results["version"] = version
+        return results
+
+    # Handle tuple return from urlhaus
+    if isinstance(results.get("urlhaus"), tuple):
+         urlhaus_data, urlhaus_tags = results["urlhaus"]
+         results["urlhaus"] = urlhaus_data
+         results["urlhaus_tags"] = urlhaus_tags
+    else:
+         results["urlhaus_tags"] = {}
+
+    # --- Cross-Correlation Logic ---
+    # Rows are shared with earlier snapshots, so flag copies instead of mutating
+    for key, data in results.items():
+        if isinstance(data, list):
+            flagged = []
+            for item in data:
+                ioc = row_ioc(item)
+                match = index.get(ioc) if index is not None and ioc else None
+                if match and match['count'] > 1:
+                    item = dict(item, correlated=True, sources=match['sources'], hits=match['hits'])
+                flagged.append(item)
+            results[key] = flagged
+
+    results["version"] = version
+    # Full IOC count per feed; the lists above are only the first page
+    results["totals"] = totals or {}
+    return results
+
+def apply_delta(rows, added, removed):
+    """What the dashboard's applyDelta() makes of a feed's rows: added rows first,
+    then the old rows that were neither replaced nor removed"""
+    replaced = set(removed) | {row_ioc(item) for item in added}
+    return added + [item for item in rows if row_ioc(item) not in replaced]
+
+def diff_snapshots(old, new):
+    """Per-feed changes between two payloads: {'added': rows added or changed, 'removed':
+    their iocs}, or {'rows': every row} when rows keyed by IOC cannot rebuild the feed
+    (an IOC missing or repeated, or an order applyDelta() would not reproduce)"""
+    changes = {}
+    for key in FEED_PROFILES:
+        old_rows, new_rows = old.get(key) or [], new.get(key) or []
+        if old_rows is new_rows:
+            continue
+        before = {row_ioc(item): item for item in old_rows}
+        after = {row_ioc(item): item for item in new_rows}
+        if None in before or None in after or len(before) != len(old_rows) or len(after) != len(new_rows):
+            changes[key] = {'rows': new_rows}
+            continue
+        added = [item for ioc, item in after.items() if before.get(ioc) != item]
+        removed = [ioc for ioc in before if ioc not in after]
+        if not added and not removed:
+            continue
+        changes[key] = {'added': added, 'removed': removed} if apply_delta(old_rows, added, removed) == new_rows else {'rows': new_rows}
+    return changes
+
+def delta_payload(data, since, changes):
+    """/api/data body carrying only the row changes, plus the small non-row fields"""
+    payload = {key: value for key, value in data.items() if not isinstance(value, list)}
+    payload.update(simulation=data.get('simulation', False), since=since, delta=changes)
+    return payload
+
+# --- LIVE PUSH ---
+class SnapshotBroadcaster:
+    """Fans every published version out to the /api/stream clients. Each event is
+    serialized once when the snapshot is published; clients only wait on a
+    condition and copy the same bytes, however many of them are connected."""
+
+    def __init__(self, history=DELTA_HISTORY, limit=STREAM_LIMIT):
+        self._events = deque(maxlen=history)    # (version, SSE-encoded bytes)
+        self._cond = threading.Condition()
+        self.limit = limit
+        self.clients = 0
+
+    def admit(self):
+        """Reserves a slot for one more client; False once `limit` are connected"""
+        with self._cond:
+            if self.limit and self.clients >= self.limit:
+                return False
+            self.clients += 1
+            return True
+
+    def leave(self):
+        with self._cond:
+            self.clients -= 1
+
+    def publish(self, version, payload):
+        event = f"id: {version}\nevent: delta\ndata: {json.dumps(payload)}\n\n".encode()
+        with self._cond:
+            self._events.append((version, event))
+            self._cond.notify_all()
+
+    def _after(self, version):
+        return [(v, event) for v, event in self._events if v > version]
+
+    def listen(self, since):
+        """Yields every event after version `since`, with keep-alives while idle.
+        A client too far behind (or ahead, after a restart) is told to reload."""
+        with self._cond:
+            oldest = self._events[0][0] if self._events else None
+            latest = self._events[-1][0] if self._events else 0
+        if oldest is not None and not oldest - 1 <= since <= latest:
+            yield f"event: reset\ndata: {json.dumps({'version': latest})}\n\n".encode()
+            since = latest
+        while True:
+            with self._cond:
+                pending = self._after(since)
+                if not pending:
+                    self._cond.wait(STREAM_KEEPALIVE)
+                    pending = self._after(since)
+            if not pending:
+                yield b": keep-alive\n\n"
+                continue
+            for since, event in pending:
+                yield event
+
+BROADCASTER = SnapshotBroadcaster()
+
+# --- RESPONSE ENCODING ---
+# A snapshot never changes once published, so each (format, content-encoding)
+# variant of its /api/data body is serialized and compressed at most once and
+# kept on the snapshot as immutable bytes with a strong ETag (content hash).
+# The default JSON variants are built at publish time, before any request.
+def columnar(data):
+    """Feed row lists as {'count', 'columns': {field: [values]}}: field names once per feed, not per row"""
+    out = {}
+    for key, value in data.items():
+        if isinstance(value, list) and value and isinstance(value[0], dict):
+            fields = list(dict.fromkeys(field for row in value for field in row))
+            value = {'count': len(value), 'columns': {field: [row.get(field) for row in value] for field in fields}}
+        out[key] = value
+    return out
+
+# format -> (mimetype, serializer)
+FORMATS = {
+    'json': ('application/json', lambda data: app.json.dumps(data).encode()),
+    'columnar': ('application/json', lambda data: app.json.dumps(columnar(data)).encode()),
+}
+if msgpack:
+    FORMATS['msgpack'] = ('application/msgpack', lambda data: msgpack.packb(columnar(data)))
+
+# Content-Encoding -> compressor, in order of preference
+COMPRESSORS = {'identity': lambda body: body}
+if brotli:
+    COMPRESSORS['br'] = lambda body: brotli.compress(body, quality=5)
+COMPRESSORS['gzip'] = lambda body: gzip.compress(body, compresslevel=6)
+
+Encoded = namedtuple('Encoded', 'body etag')
+
+def encoded_body(snapshot, fmt, encoding):
+    """Cached Encoded variant of a snapshot; concurrent misses may both encode, same result"""
+    variant = snapshot.encoded.get((fmt, encoding))
+    if variant is None:
+        raw = snapshot.encoded.get((fmt, 'identity'))
+        if raw is None:
+            body = FORMATS[fmt][1](snapshot.data)
+            raw = snapshot.encoded[(fmt, 'identity')] = Encoded(body, hashlib.blake2b(body, digest_size=16).hexdigest())
+        # Each content-coding is its own representation, so it gets its own strong tag
+        variant = raw if encoding == 'identity' else Encoded(COMPRESSORS[encoding](raw.body), f"{raw.etag}-{encoding}")
+        snapshot.encoded[(fmt, encoding)] = variant
+    return variant
+
+def snapshot_response(snapshot):
+    """Full /api/data body in the negotiated format (?format= or Accept) and Content-Encoding"""
+    fmt = request.args.get('format') or ('msgpack' if request.accept_mimetypes.best == 'application/msgpack' else 'json')
+    if fmt not in FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(FORMATS)}"}), 406
+    encoding = request.accept_encodings.best_match([e for e in COMPRESSORS if e != 'identity'], default='identity')
+    variant = encoded_body(snapshot, fmt, encoding)
+    if request.if_none_match.contains_weak(variant.etag):
+        response = Response(status=304)
+    else:
+        response = Response(variant.body, mimetype=FORMATS[fmt][0])
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(variant.etag)
+    # Let browsers keep the body but revalidate it on every poll
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.update(('Accept', 'Accept-Encoding'))
+    return response
+
+# --- CIRCUIT BREAKER ---
+class CircuitBreaker:
+    """closed -> open after BREAKER_THRESHOLD failures in a row; once the cooldown
+    has passed one half-open probe goes out, which either closes the circuit or
+    reopens it with twice the cooldown (capped, with a little jitter)"""
+
+    def __init__(self):
+        self.state = 'closed'
+        self.failures = 0
+        self.trips = 0
+        self.retry_at = 0.0         # monotonic time of the next probe while open
+
+    def allow(self, now):
+        if self.state == 'open':
+            if now < self.retry_at:
+                return False
+            self.state = 'half_open'
+        return True
+
+    def success(self):
+        self.state, self.failures, self.trips = 'closed', 0, 0
+
+    def failure(self, now):
+        self.failures += 1
+        if self.state == 'half_open' or self.failures >= BREAKER_THRESHOLD:
+            self.trips += 1
+            cooldown = min(BREAKER_COOLDOWN * 2 ** (self.trips - 1), BREAKER_MAX_COOLDOWN)
+            self.state, self.retry_at = 'open', now + cooldown * random.uniform(0.9, 1.1)
+
+    def status(self, now):
+        return {'circuit': self.state, 'failures': self.failures,
+                'retry_in': round(max(0.0, self.retry_at - now)) if self.state == 'open' else None}
+
+# --- SINGLE FLIGHT ---
+class SingleFlight:
+    """Coalesces concurrent calls under one key: the first caller runs the work,
+    callers arriving while it runs wait for it and share its result or error."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = concurrent.futures.Future()
+        if leader:
+            try:
+                future.set_result(fn(*args))
+            except BaseException as exc:
+                future.set_exception(exc)
+            finally:
+                with self._lock:
+                    del self._calls[key]
+        return future.result()
+
+    def busy(self, key):
+        with self._lock:
+            return key in self._calls
+
+# --- PERSISTENT STORE ---
+class FeedStore:
+    """SQLite copy of each feed's last good result: the page rows, the HTTP
+    validators and the full IOC set, with per-feed first/last-seen history per
+    IOC. Lets a restart publish the last good snapshot straight away and
+    revalidate with 304s. History is written from per-refresh diffs like the
+    correlation index; last_seen stays NULL while a feed still lists the IOC."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS feeds (key TEXT PRIMARY KEY, url TEXT, result TEXT, etag TEXT, last_modified TEXT, fetched_at TEXT);
+        CREATE TABLE IF NOT EXISTS iocs (feed TEXT, ioc TEXT, first_seen REAL, last_seen REAL, PRIMARY KEY (feed, ioc)) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS iocs_by_value ON iocs (ioc);
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.executescript(self.SCHEMA)
+        return self._db
+
+    def save(self, key, url, result, old_column, new_column, fetched_at, etag=None, last_modified=None):
+        """Persists one feed refresh; only IOCs that entered or left the feed are written"""
+        now = time.time()
+        body = json.dumps({'pair': isinstance(result, tuple), 'result': result})
+        added = [(key, ioc, now) for ioc in new_column if old_column is None or ioc not in old_column]
+        removed = [(now, key, ioc) for ioc in old_column if ioc not in new_column] if old_column is not None else []
+        with self._lock, self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO feeds VALUES (?, ?, ?, ?, ?, ?)", (key, url, body, etag, last_modified, fetched_at))
+            db.executemany("INSERT INTO iocs VALUES (?, ?, ?, NULL) ON CONFLICT (feed, ioc) DO UPDATE SET last_seen = NULL", added)
+            db.executemany("UPDATE iocs SET last_seen = ? WHERE feed = ? AND ioc = ?", removed)
+
+    def load(self, keys):
+        """{key: (url, result, listed iocs, etag, last_modified, fetched_at)} for the given feeds"""
+        with self._lock:
+            db = self._connect()
+            saved = {}
+            for key, url, body, etag, last_modified, fetched_at in db.execute("SELECT * FROM feeds"):
+                if key not in keys:
+                    continue
+                stored = json.loads(body)
+                result = tuple(stored['result']) if stored['pair'] else stored['result']
+                iocs = [ioc for (ioc,) in db.execute("SELECT ioc FROM iocs WHERE feed = ? AND last_seen IS NULL", (key,))]
+                saved[key] = (url, result, iocs, etag, last_modified, fetched_at)
+            return saved
+
+    def history(self, ioc):
+        """{feed: {'first_seen', 'last_seen'}} for every feed that ever listed the IOC; last_seen None while listed"""
+        stamp = lambda value: datetime.fromtimestamp(value, timezone.utc).isoformat() if value is not None else None
+        with self._lock:
+            rows = self._connect().execute("SELECT feed, first_seen, last_seen FROM iocs WHERE ioc = ?", (ioc,)).fetchall()
+        return {feed: {'first_seen': stamp(first), 'last_seen': stamp(last)} for feed, first, last in rows}
+
+STORE = FeedStore(STORE_PATH) if STORE_PATH else None
+
+# --- SNAPSHOT LOG ---
+class SnapshotLog:
+    """Published snapshots on disk, for web workers in the multi-process mode.
+    <dir>/<version>.json holds one snapshot's payload and view inputs, LATEST
+    names the newest version and status.json the fetcher's feed health. The
+    last DELTA_HISTORY versions are kept so a worker can replay each step and
+    serve the same deltas and push events as the fetcher."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def stamp(self):
+        """Changes whenever LATEST is replaced; None before the first publish"""
+        try:
+            stat = os.stat(os.path.join(self.path, 'LATEST'))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def latest(self):
+        try:
+            with open(os.path.join(self.path, 'LATEST'), encoding='utf-8') as fh:
+                return int(fh.read())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def read(self, name):
+        try:
+            with open(os.path.join(self.path, name), encoding='utf-8') as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return None
+
+    def write(self, version, record):
+        os.makedirs(self.path, exist_ok=True)
+        atomic_write(os.path.join(self.path, f"{version}.json"), [json.dumps(record).encode()])
+        atomic_write(os.path.join(self.path, 'LATEST'), [str(version).encode()])
+        for name in os.listdir(self.path):
+            stem = name[:-len('.json')]
+            if stem.isdigit() and int(stem) <= version - DELTA_HISTORY:
+                os.remove(os.path.join(self.path, name))
+
+    def write_status(self, report):
+        os.makedirs(self.path, exist_ok=True)
+        atomic_write(os.path.join(self.path, 'status.json'), [json.dumps(report).encode()])
+
+SNAPSHOT_DIR = os.path.join(DATA_DIR, 'snapshots') if DATA_DIR else None
+
+# --- BACKGROUND SCHEDULER ---
+def feed_age(checked, stale_after, now):
+    """{'age', 'stale'} at `now` of a feed upstream last confirmed at epoch `checked` (None: never)"""
+    age = round(now - checked) if checked else None
+    return {'age': age, 'stale': age is None or age > stale_after}
+
+class FeedScheduler:
+    """Refreshes each feed on its own interval and publishes versioned snapshots"""
+
+    def __init__(self, feeds, max_workers=10, store=None, segments=None, log=None):
+        self.feeds = feeds
+        self.store = store
+        self.segments = segments
+        self.log = log
+        self.results = {}
+        self.next_due = {}
+        self.breakers = {}
+        self._track_feeds()
+        self.snapshot = None
+        self.recent = OrderedDict()     # version -> Snapshot, keeps page cursors valid across publishes
+        self.deltas = deque(maxlen=DELTA_HISTORY)   # (version, diff_snapshots() against version - 1)
+        self.fetched_at = {}
+        self.checked_at = {}            # feed key -> epoch upstream last confirmed its rows (200 or 304)
+        self._published_checks = {}     # checked_at as of the current snapshot
+        self._version = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._flights = SingleFlight()
+        self._cycle = threading.Lock()  # one refresh cycle at a time, scheduled or requested
+        self._thread = None
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="feed")
+        # The async engine only bounds concurrency per host, so give it a thread per feed
+        self._async_executor = None
+        if FETCH_ENGINE == 'async':
+            self._async_executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(feeds), thread_name_prefix="feed-async")
+
+    def _track_feeds(self):
+        """Per-feed state for the feeds currently registered (register_feed() may run after import)"""
+        for key in self.feeds:
+            self.results.setdefault(key, [])
+            self.next_due.setdefault(key, 0.0)
+            self.breakers.setdefault(key, CircuitBreaker())
+        for key in [key for key in self.results if key not in self.feeds]:
+            del self.results[key], self.next_due[key], self.breakers[key]
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._track_feeds()
+                self._thread = threading.Thread(target=self._run, name="feed-scheduler", daemon=True)
+                self._thread.start()
+
+    def wait_ready(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def run(self):
+        """Runs the refresh schedule in the calling thread (the fetcher process)"""
+        self.start()
+        self._thread.join()
+
+    def _warm_start(self):
+        """Publishes the stored last good results before the first refresh cycle"""
+        try:
+            saved = self.store.load(self.feeds) if self.store else {}
+        except sqlite3.Error as exc:
+            print(f"⚠️  Feed store unavailable ({exc}); starting cold.")
+            return
+        for key, (url, result, iocs, etag, last_modified, fetched_at) in saved.items():
+            column = IOCColumn()
+            for ioc in iocs:
+                column.add(ioc)
+            column.freeze()
+            self.results[key] = result
+            self.fetched_at[key] = fetched_at
+            self.checked_at[key] = parse_time(fetched_at)
+            CORRELATION.update(key, None, column)
+            IOC_STORE.replace(key, column)
+            # Only revalidate against the URL the result came from
+            if url == self.feeds[key].args[0]:
+                FEED_CACHE.seed(url, (result, column), etag, last_modified)
+        if any(has_rows(result) for result in self.results.values()):
+            self.publish()
+
+    def _guarded(self, step, *args):
+        """Runs one scheduler step; an unexpected error is logged instead of ending the thread"""
+        try:
+            step(*args)
+            return True
+        except Exception as exc:
+            print(f"⚠️  Scheduler {step.__name__} failed ({error_class(exc)}: {exc}); carrying on.")
+            traceback.print_exc()
+            return False
+
+    def _run(self):
+        with self._cycle:
+            self._guarded(self._warm_start)
+        while True:
+            now = time.monotonic()
+            due = [key for key, at in self.next_due.items() if at <= now]
+            with self._cycle:
+                if due:
+                    if not self._guarded(self.refresh, due):
+                        # Back off the feeds the failed cycle left due instead of spinning on them
+                        retry = time.monotonic() + CYCLE_RETRY
+                        for key in due:
+                            if self.next_due.get(key, retry) < retry:
+                                self.next_due[key] = retry
+            time.sleep(max(0.5, min(self.next_due.values()) - time.monotonic()))
+
+    def freshness(self, now=None):
+        """Per-feed {'fetched_at', 'age', 'stale'} as of now: when upstream last confirmed the feed's rows"""
+        now = now or time.time()
+        fresh = {}
+        for key, feed in self.feeds.items():
+            checked = self.checked_at.get(key)
+            fresh[key] = dict(fetched_at=datetime.fromtimestamp(checked, timezone.utc).isoformat() if checked else None,
+                              **feed_age(checked, STALE_AFTER * feed.interval, now))
+        return fresh
+
+    def freshness_stamps(self):
+        """The snapshot's freshness map: {'fetched_at', 'stale_after'} per feed. Published
+        bodies are cached, so readers derive age and staleness from these when they read them."""
+        return {key: {'fetched_at': datetime.fromtimestamp(self.checked_at[key], timezone.utc).isoformat() if key in self.checked_at else None,
+                      'stale_after': STALE_AFTER * feed.interval}
+                for key, feed in self.feeds.items()}
+
+    def _reconfirmed(self):
+        """Whether upstream confirmed a feed the current snapshot already shows as stale"""
+        now = time.time()
+        for key, feed in self.feeds.items():
+            published = self._published_checks.get(key)
+            if self.checked_at.get(key, published) != published and feed_age(published, STALE_AFTER * feed.interval, now)['stale']:
+                return True
+        return False
+
+    def revalidate(self):
+        """Starts sync() in the background and returns at once; a cycle already running absorbs it"""
+        if not self._flights.busy('*'):
+            threading.Thread(target=self.sync, name='feed-sync', daemon=True).start()
+
+    def sync(self):
+        """Refreshes every feed now (FEED_CACHE still answers within each ttl) and returns
+        the resulting snapshot. Concurrent callers share one cycle instead of each
+        starting their own."""
+        return self._flights.do('*', self._sync)
+
+    def _sync(self):
+        with self._cycle:
+            self.refresh(list(self.feeds))
+        return self.snapshot
+
+    def _fetch(self, key):
+        """(rows, column) for one feed. A feed is fetched by one caller at a time: an
+        async-engine straggler still running when its retry comes due is joined,
+        not fetched a second time."""
+        return self._flights.do(key, self._fetch_once, key)
+
+    def _fetch_once(self, key):
+        """Returns (rows, column) for one feed, from FEED_CACHE when possible"""
+        feed = self.feeds[key]
+        url = feed.args[0]
+        cached = FEED_CACHE.fresh(url, feed.ttl)
+        if cached is not None:
+            TELEMETRY.record(key, 'cached')
+            self.breakers[key].success()
+            return cached
+        column = IOCColumn()
+        started, outcome, error = TELEMETRY.begin(), 'ok', None
+        try:
+            rows = self._download(feed, column)
+        except NotModified:
+            cached = FEED_CACHE.revalidated(url)
+            if cached is not None:
+                # 304: keep the parsed result we already have, skip the re-parse
+                TELEMETRY.record(key, 'not_modified', started)
+                self.breakers[key].success()
+                self.checked_at[key] = time.time()
+                return cached
+            # A 304 with nothing cached to reuse: fetch again without validators;
+            # an upstream that answers 304 regardless counts as a failed fetch
+            try:
+                rows = self._download(feed, column)
+            except Exception as exc:
+                rows, outcome, error = [], 'error', exc
+        except Exception as exc:
+            rows, outcome, error = [], 'error', exc
+        result = (rows, column.freeze())
+        if outcome == 'ok' and not has_rows(rows):
+            outcome = 'empty'
+        TELEMETRY.record(key, outcome, started, len(result[1]), error)
+        # An empty 200 (error page, moved list) costs as much as an error
+        if outcome == 'ok':
+            self.breakers[key].success()
+            self.checked_at[key] = time.time()
+        else:
+            self.breakers[key].failure(time.monotonic())
+        if has_rows(rows):
+            FEED_CACHE.store(url, result)
+        else:
+            FEED_CACHE.forget(url)
+        return result
+
+    def _download(self, feed, column):
+        """Fetches and parses one feed, adding its IOCs to column"""
+        if FULL_INGEST:
+            return feed.fetch(*feed.args, limit=feed.limit, timeout=feed.timeout, ingest=column.add)
+        rows = feed.fetch(*feed.args, limit=feed.limit, timeout=feed.timeout)
+        page = rows[0] if isinstance(rows, tuple) else rows
+        for item in page:
+            column.add(row_ioc(item))
+        return rows
+
+    def _gather_threaded(self, keys):
+        futures = {key: self._executor.submit(self._fetch, key) for key in keys}
+        return {key: future.result() for key, future in futures.items()}
+
+    async def _gather_async(self, keys):
+        loop = asyncio.get_running_loop()
+        host_limits = {}
+
+        async def run(key):
+            host = urlsplit(self.feeds[key].args[0]).hostname
+            limit = host_limits.setdefault(host, asyncio.Semaphore(PER_HOST_LIMIT))
+            async with limit:
+                return key, await loop.run_in_executor(self._async_executor, self._fetch, key)
+
+        tasks = [asyncio.create_task(run(key)) for key in keys]
+        done, pending = await asyncio.wait(tasks, timeout=REFRESH_DEADLINE)
+        for task in pending:
+            task.cancel()
+        return dict(task.result() for task in done)
+
+    def refresh(self, keys):
+        """Fetches the given feeds concurrently, then publishes a snapshot if anything changed"""
+        now = time.monotonic()
+        # Open circuits sit the cycle out until their next probe
+        for key in [key for key in keys if not self.breakers[key].allow(now)]:
+            self.next_due[key] = self.breakers[key].retry_at
+        keys = [key for key in keys if self.breakers[key].state != 'open']
+        if self._async_executor:
+            gathered = asyncio.run(self._gather_async(keys))
+            # Stragglers keep their previous rows and are retried shortly; the
+            # retry joins the still-running fetch or finds its result in FEED_CACHE
+            for key in set(keys) - set(gathered):
+                self.next_due[key] = time.monotonic() + REFRESH_DEADLINE
+        else:
+            gathered = self._gather_threaded(keys)
+        changed = self.snapshot is None
+        for key, (result, column) in gathered.items():
+            breaker = self.breakers[key]
+            self.next_due[key] = breaker.retry_at if breaker.state == 'open' else time.monotonic() + self.feeds[key].interval
+            # Cache hits and 304s hand back the very same object; a failed or
+            # empty fetch keeps serving the feed's last good rows
+            previous = self.results[key]
+            if result is previous:
+                CORRELATION.update(key, column, column)
+                continue
+            if not has_rows(result) and has_rows(previous):
+                continue
+            changed = changed or has_rows(result) or has_rows(previous)
+            old_column = IOC_STORE.columns.get(key)
+            self.results[key] = result
+            CORRELATION.update(key, old_column, column)
+            IOC_STORE.replace(key, column)
+            if has_rows(result):
+                self.fetched_at[key] = datetime.now(timezone.utc).isoformat()
+                self._persist(key, result, old_column, column)
+        if changed or (self.snapshot is not None and self._reconfirmed()):
+            self.publish()
+        if self.log is not None:
+            try:
+                self.log.write_status(self.status_report())
+            except OSError as exc:
+                print(f"⚠️  Could not write feed status: {exc}")
+
+    def _persist(self, key, result, old_column, column):
+        if self.store is None:
+            return
+        url = self.feeds[key].args[0]
+        try:
+            self.store.save(key, url, result, old_column, column, self.fetched_at[key], *FEED_CACHE.tags(url))
+        except sqlite3.Error as exc:
+            print(f"⚠️  Could not persist {key}: {exc}")
+
+    def publish(self):
+        with self._lock:
+            version = self._version + 1
+            # Keep version numbers rising across fetcher restarts, workers follow them
+            if self.log is not None:
+                version = max(version, self.log.latest() + 1)
+            data = build_snapshot(self.results, version, IOC_STORE.totals(), CORRELATION)
+            data['freshness'] = self.freshness_stamps()
+            self._published_checks = dict(self.checked_at)
+            columns = dict(IOC_STORE.columns) if not data.get('simulation') else {}
+            shared = CORRELATION.shared_by_feed() if columns else {}
+            if self.segments is not None and columns:
+                self._write_segments(version, columns)
+            self._install(version, data, columns, dict(self.fetched_at), shared)
+            if self.log is not None:
+                record = {'generated_at': self.snapshot.generated_at, 'data': data, 'fetched_at': self.fetched_at, 'shared': shared}
+                try:
+                    self.log.write(version, record)
+                except OSError as exc:
+                    print(f"⚠️  Could not write snapshot {version}: {exc}")
+        self._ready.set()
+
+    def _install(self, version, data, columns, fetched_at, shared, generated_at=None):
+        """Makes `data` the current snapshot: view, summary, delta, pre-encoded bodies, push event.
+        Called with the lock held."""
+        view = UnifiedView(data, columns, fetched_at, shared)
+        data['summary'] = view.summary()
+        changes = diff_snapshots(self.snapshot.data if self.snapshot else {}, data)
+        self.deltas.append((version, changes))
+        snapshot = Snapshot(version, generated_at or datetime.now(timezone.utc).isoformat(), data, view, {})
+        for encoding in COMPRESSORS:
+            encoded_body(snapshot, 'json', encoding)
+        self._version = version
+        self.snapshot = snapshot
+        self.recent[version] = snapshot
+        while len(self.recent) > RECENT_SNAPSHOTS:
+            self.recent.popitem(last=False)
+        BROADCASTER.publish(version, delta_payload(data, version - 1, changes))
+
+    def _write_segments(self, version, columns):
+        refreshed = {key: parse_time(self.fetched_at.get(key)) or time.time() for key in columns}
+        try:
+            self.segments.publish(version, columns, refreshed)
+        except OSError as exc:
+            print(f"⚠️  Could not write IOC segments: {exc}")
+
+    def status_report(self):
+        """/api/status and /metrics bodies: per-feed telemetry and circuit-breaker state"""
+        health, now = TELEMETRY.status(), time.monotonic()
+        freshness = self.freshness()
+        feeds = {key: dict(health.get(key, {}), **self.breakers[key].status(now), **freshness[key],
+                           source=FEED_PROFILES[key].source, interval=feed.interval)
+                 for key, feed in self.feeds.items()}
+        lines = ["# HELP hunters_gaze_feed_circuit_open Whether the feed's circuit breaker is open (1) or not (0).",
+                 "# TYPE hunters_gaze_feed_circuit_open gauge"]
+        lines += [f'hunters_gaze_feed_circuit_open{{feed="{key}"}} {int(breaker.state == "open")}'
+                  for key, breaker in sorted(self.breakers.items())]
+        return {'version': self.snapshot.version if self.snapshot else 0, 'feeds': feeds,
+                'metrics': TELEMETRY.prometheus() + '\n'.join(lines) + '\n'}
+
+    def delta_since(self, version):
+        """(snapshot, per-feed changes since `version`), changes None once the history no longer reaches back"""
+        with self._lock:
+            snapshot, deltas = self.snapshot, list(self.deltas)
+        if not deltas or not deltas[0][0] - 1 <= version < snapshot.version:
+            return snapshot, None
+        merged = {}
+        for delta_version, changes in deltas:
+            if delta_version <= version:
+                continue
+            for key, change in changes.items():
+                # Stacked deltas need not reproduce the current row order, so a feed
+                # that changed more than once since `version` is sent whole
+                merged[key] = change if key not in merged else {'rows': snapshot.data.get(key) or []}
+        return snapshot, merged
+
+class SnapshotFollower(FeedScheduler):
+    """A web worker's scheduler: never fetches. It replays the snapshots the fetcher
+    process publishes to DATA_DIR in order, so each worker serves the same versions,
+    deltas, cursors and push events without downloading a single feed."""
+
+    def __init__(self, feeds, log, segments=None):
+        super().__init__(feeds, max_workers=1)
+        self.log = log
+        self.segment_dir = segments
+
+    def _run(self):
+        stamp = None
+        while True:
+            current = self.log.stamp()
+            # A failed catch-up (snapshot or manifest unreadable) is retried next poll
+            if current is not None and current != stamp and self._guarded(self._catch_up):
+                stamp = current
+            time.sleep(FOLLOW_INTERVAL)
+
+    def _catch_up(self):
+        latest = self.log.latest()
+        # A fetcher whose log was wiped starts over; replay only its latest snapshot
+        first = latest if latest < self._version else max(self._version + 1, latest - DELTA_HISTORY + 1)
+        for version in range(first, latest + 1):
+            record = self.log.read(f"{version}.json")
+            if record is None:
+                continue
+            segments = self.segment_dir.current() if self.segment_dir and not record['data'].get('simulation') else None
+            if self.segment_dir and not record['data'].get('simulation') and segments is None:
+                raise OSError(f"no loadable segment manifest for version {version}")
+            with self._lock:
+                self._install(version, record['data'], segments.segments if segments else {}, record['fetched_at'],
+                              record['shared'], record['generated_at'])
+            self._ready.set()
+
+    def sync(self):
+        # Workers never fetch; the fetcher's schedule decides when feeds refresh
+        return self.snapshot
+
+    def status_report(self):
+        report = self.log.read('status.json')
+        if not report:
+            return {'version': self._version, 'feeds': {}, 'metrics': ''}
+        # The fetcher wrote it a while ago; age and staleness are as of this request
+        now = time.time()
+        for feed in report['feeds'].values():
+            feed.update(feed_age(parse_time(feed.get('fetched_at')), STALE_AFTER * feed['interval'], now))
+        return report
+
+if ROLE == 'web':
+    SCHEDULER = SnapshotFollower(FEEDS, SnapshotLog(SNAPSHOT_DIR), SEGMENTS)
+else:
+    SCHEDULER = FeedScheduler(FEEDS, store=STORE, segments=SegmentWriter(SEGMENT_DIR) if SEGMENT_DIR else None,
+                              log=SnapshotLog(SNAPSHOT_DIR) if ROLE == 'fetcher' else None)
 
 # --- ROUTES ---
 
 @app.route('/')
 def home():
+    SCHEDULER.start()
     return render_template_string(HTML_TEMPLATE)
 
 @app.route('/api/data')
 def api_data():
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {
-            "sans": executor.submit(get_sans),
-            "urlhaus": executor.submit(get_urlhaus),
-            "threatfox": executor.submit(get_threatfox),
-            "feodo": executor.submit(get_feodo),
-            "bazaar": executor.submit(get_bazaar),
-            "cisa": executor.submit(get_cisa_kev),
-            "osint": executor.submit(get_text_list, "https://osint.digitalside.it/threat-intel/lists/latestdomains.txt", "ioc"),
-            "openphish": executor.submit(get_text_list, "https://openphish.com/feed.txt", "url"),
-            "tor": executor.submit(get_text_list, "https://check.torproject.org/torbulkexitlist", "ip"),
-            "blocklist": executor.submit(get_text_list, "https://lists.blocklist.de/lists/ssh.txt", "ip"),
-            "botvrij": executor.submit(get_text_list, "https://www.botvrij.eu/data/ioclist.ip-v4", "ip"),
-            "greensnow": executor.submit(get_text_list, "https://blocklist.greensnow.co/greensnow.txt", "ip"),
-            "vxvault": executor.submit(get_text_list, "http://vxvault.net/URL_List.php", "url"),
-            "phishdb": executor.submit(get_text_list, "https://raw.githubusercontent.com/mitchellkrogza/Phishing.Database/master/phishing-links-NEW-today.txt", "url"),
-            "coinblocker": executor.submit(get_text_list, "https://raw.githubusercontent.com/ZeroDot1/CoinBlockerLists/master/list_browser.txt", "domain"),
-            "et": executor.submit(get_text_list, "https://rules.emergingthreats.net/blockrules/compromised-ips.txt", "ip"),
-            "sslbl": executor.submit(get_text_list, "https://sslbl.abuse.ch/blacklist/sslblacklist.csv", "sha1", lambda l: l.split(',')[1] if ',' in l else None),
-            "binary": executor.submit(get_text_list, "https://www.binarydefense.com/banlist.txt", "ip"),
-            "cins": executor.submit(get_text_list, "http://cinsscore.com/list/ci-badguys.txt", "ip"),
-            "spamhaus": executor.submit(get_text_list, "https://www.spamhaus.org/drop/drop.txt", "ip", lambda l: l.split(';')[0].strip()),
-            "bambenek": executor.submit(get_text_list, "http://osint.bambenekconsulting.com/feeds/c2-ipmasterlist.txt", "ip", lambda l: l.split(',')[0]),
-            "stopforum": executor.submit(get_text_list, "https://www.stopforumspam.com/downloads/toxic_ip_cidr.txt", "ip"),
-            "darklist": executor.submit(get_text_list, "https://darklist.de/raw.php", "ip"),
-            "proxies": executor.submit(get_text_list, "https://raw.githubusercontent.com/TheSpeedX/SOCKS-List/master/socks5.txt", "ip", lambda l: l.split(':')[0]),
-            "cybercrime": executor.submit(get_text_list, "https://cybercrime-tracker.net/all.php", "url"),
-            "urlvir": executor.submit(get_text_list, "http://www.urlvir.com/export-hosts/", "url"),
-            "phishstats": executor.submit(get_text_list, "https://phishstats.info/phish_score.csv", "url", lambda l: l.split(',')[2].strip('"') if len(l.split(',')) > 2 and not l.startswith('#') else None),
-            "mdl": executor.submit(get_mdl),
-            "dga": executor.submit(get_text_list, "http://osint.bambenekconsulting.com/feeds/dga-feed.txt", "domain", lambda l: l.split(',')[0] if ',' in l else None),
-            "apache": executor.submit(get_text_list, "https://lists.blocklist.de/lists/apache.txt", "ip"),
-            "mail": executor.submit(get_text_list, "https://lists.blocklist.de/lists/mail.txt", "ip"),
-            "ftp": executor.submit(get_text_list, "https://lists.blocklist.de/lists/ftp.txt", "ip"),
-            "imap": executor.submit(get_text_list, "https://lists.blocklist.de/lists/imap.txt", "ip"),
-            "sip": executor.submit(get_text_list, "https://lists.blocklist.de/lists/sip.txt", "ip"),
-            "bots": executor.submit(get_text_list, "https://lists.blocklist.de/lists/bots.txt", "ip"),
-            "cleanmx": executor.submit(get_text_list, "http://lists.clean-mx.com/pipermail/viruswatch/", "url"), # Placeholder scrape
-            "cybercure": executor.submit(get_text_list, "http://api.cybercure.ai/feed/get_ips", "ip"),
-            "rutgers": executor.submit(get_text_list, "https://report.cs.rutgers.edu/DROP/attackers", "ip"),
-            "nipr": executor.submit(get_text_list, "https://raw.githubusercontent.com/firehol/blocklist-ipsets/master/nipr_iscs.ipset", "ip"),
-            "uce": executor.submit(get_text_list, "http://wget-mirrors.uceprotect.net/rbldnsd-all/dnsbl-1.uceprotect.net.gz", "ip") # Simplified
-        }
-
-        results = {}
-        has_data = False
-        for key, future in futures.items():
-            try:
-                res = future.result()
-                if res and (isinstance(res, list) and len(res) > 0) or (isinstance(res, tuple) and len(res[0]) > 0):
-                    has_data = True
-                results[key] = res
-            except Exception as e:
-                results[key] = []
-
-        # --- AUTO-FAILOVER TO MOCK DATA ---
-        if not has_data:
-            return jsonify(generate_mock_data())
-
-        # Handle tuple return from urlhaus
-        if isinstance(results["urlhaus"], tuple):
-             urlhaus_data, urlhaus_tags = results["urlhaus"]
-             results["urlhaus"] = urlhaus_data
-             results["urlhaus_tags"] = urlhaus_tags
-        else:
-             results["urlhaus_tags"] = {}
-
-        # --- Cross-Correlation Logic ---
-        all_iocs = []
-        for key, data in results.items():
-            if isinstance(data, list):
-                for item in data:
-                    ioc = item.get('ip') or item.get('url') or item.get('domain') or item.get('hash') or item.get('cveID') or item.get('sha1')
-                    if ioc: all_iocs.append(ioc)
-        
-        ioc_counts = Counter(all_iocs)
-        
-        for key, data in results.items():
-            if isinstance(data, list):
-                for item in data:
-                    ioc = item.get('ip') or item.get('url') or item.get('domain') or item.get('hash') or item.get('cveID') or item.get('sha1')
-                    if ioc and ioc_counts[ioc] > 1:
-                        item['correlated'] = True
+    SCHEDULER.start()
+    # Always answered from the last good snapshot; only a cold start with nothing
+    # stored waits for the first refresh cycle
+    SCHEDULER.wait_ready(timeout=15)
+    # ?refresh=1 (the SYNC button) starts a refresh in the background; simultaneous
+    # requests share one cycle and its result arrives as the next version
+    if request.args.get('refresh') == '1':
+        SCHEDULER.revalidate()
+    snapshot = SCHEDULER.snapshot
+    if snapshot is None:
+        data = generate_mock_data()
+        data['summary'] = UnifiedView(data).summary()
+        return jsonify(data)
+    # ?since=<version>: nothing new is a bodiless 304, a recent version gets only
+    # the rows added or removed since, anything older the full payload
+    since = request.args.get('since', type=int)
+    if since is not None:
+        if since == snapshot.version:
+            return Response(status=304)
+        snapshot, changes = SCHEDULER.delta_since(since)
+        if changes is not None:
+            return jsonify(delta_payload(snapshot.data, since, changes))
+    return snapshot_response(snapshot)
+
+@app.route('/api/status')
+def api_status():
+    """Per-feed fetch health: last outcome and error, latency, parse time, bytes, IOCs"""
+    SCHEDULER.start()
+    report = SCHEDULER.status_report()
+    return jsonify({'version': report['version'], 'feeds': report['feeds']})
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape target for the per-feed telemetry"""
+    SCHEDULER.start()
+    return Response(SCHEDULER.status_report()['metrics'], content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/stream')
+def api_stream():
+    """Server-Sent Events: one `delta` event per published version, in order.
+    Browsers reconnect with Last-Event-ID and resume where they left off."""
+    SCHEDULER.start()
+    since = request.headers.get('Last-Event-ID') or request.args.get('since') or 0
+    try:
+        since = int(since)
+    except ValueError:
+        return jsonify({'error': 'since must be a snapshot version'}), 400
+    # Past the per-process limit clients poll /api/data instead of holding a worker
+    if not BROADCASTER.admit():
+        return jsonify({'error': 'stream limit reached, poll /api/data'}), 503, {'Retry-After': '60'}
+    response = Response(stream_with_context(BROADCASTER.listen(since)), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Runs when the server closes the response, whether or not the body was ever iterated
+    response.call_on_close(BROADCASTER.leave)
+    return response
+
+def parse_cursor(cursor):
+    """'version.entry.offset' -> (version, (entry, offset)), or None if malformed"""
+    try:
+        version, i, j = (int(part) for part in cursor.split('.'))
+    except (AttributeError, ValueError):
+        return None
+    return (version, (i, j)) if min(version, i, j) >= 0 else None
+
+@app.route('/api/iocs')
+def api_iocs():
+    """One page of the unified IOC view: ?source=&category=&correlated=1&q=&sort=&limit=&cursor="""
+    SCHEDULER.start()
+    SCHEDULER.wait_ready(timeout=15)
+    snapshot = SCHEDULER.snapshot
+    view = snapshot.view if snapshot else UnifiedView(generate_mock_data())
+    version, start = (snapshot.version if snapshot else 0), (0, 0)
+    args = request.args
+    if args.get('cursor'):
+        parsed = parse_cursor(args['cursor'])
+        if parsed is None:
+            return jsonify({'error': 'malformed cursor'}), 400
+        # Keep paging the snapshot the cursor came from while it is still around;
+        # once it is gone the client has to start over rather than silently skip rows.
+        # One get(): a publish may evict it between a membership test and a lookup
+        cursor_snapshot = SCHEDULER.recent.get(parsed[0])
+        if cursor_snapshot is None:
+            return jsonify({'error': 'cursor expired', 'version': version}), 410
+        version, start = parsed
+        view = cursor_snapshot.view
+    sort = args.get('sort', 'time')
+    if sort not in VIEW_ORDERS:
+        return jsonify({'error': f"sort must be one of {', '.join(VIEW_ORDERS)}"}), 400
+    if not view.holds(start, sort):
+        return jsonify({'error': 'cursor out of range'}), 400
+    try:
+        limit = max(1, min(int(args.get('limit', PAGE_SIZE)), PAGE_LIMIT))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    filters = dict(source=args.get('source', 'all'), category=args.get('category', 'all'),
+                   correlated=args.get('correlated') == '1', q=args.get('q', '').strip())
+    items, position = view.query(sort=sort, start=start, limit=limit, **filters)
+    return jsonify({
+        'version': version,
+        'items': items,
+        'next_cursor': f"{version}.{position[0]}.{position[1]}" if position else None,
+        'total': view.count(**filters),
+    })
+
+def lookup_index():
+    """Where IOC lookups are answered: the shared segment files when DATA_DIR is set, else this process's index"""
+    segments = SEGMENTS.current() if SEGMENTS is not None else None
+    return segments if segments is not None else CORRELATION
+
+def describe_match(ioc, match):
+    """Lookup answer for one normalized IOC: which feeds list it, their categories and the top risk"""
+    feeds = [{'source': FEED_PROFILES[key].source, 'category': FEED_PROFILES[key].category,
+              'risk': FEED_PROFILES[key].risk, 'feed': key} for key in match['sources']]
+    return {
+        'ioc': ioc,
+        'found': True,
+        'sources': feeds,
+        'categories': sorted({f['category'] for f in feeds}),
+        'risk': max(f['risk'] for f in feeds),
+        'count': match['count'],
+        'first_seen': match['first_seen'],
+        'last_seen': match['last_seen'],
+        'hits': match['hits'],
+        'ranges': match['ranges'],
+        'match': match['match'],
+    }
 
-        return jsonify(results)
+@app.route('/api/ioc/bulk', methods=['POST'])
+def api_ioc_bulk():
+    """Batch match: newline-separated text or a JSON list in, NDJSON matches out.
+    The batch is normalized in one vectorized pass and deduplicated before matching;
+    each match line lists the submitted values that normalized to it."""
+    SCHEDULER.start()
+    started = time.perf_counter()
+    if request.is_json:
+        payload = request.get_json(silent=True)
+        values = payload.get('iocs', []) if isinstance(payload, dict) else payload
+    else:
+        values = request.get_data(as_text=True).splitlines()
+    if not isinstance(values, list):
+        return jsonify({'error': 'expected a JSON list or newline-separated IOCs'}), 400
+    if len(values) > BULK_LIMIT:
+        return jsonify({'error': f'batch exceeds {BULK_LIMIT} IOCs'}), 413
+    submitted = {}      # normalized IOC -> the values it came from, in submission order
+    for value, ioc in zip(values, normalize_iocs(values)):
+        if ioc:
+            submitted.setdefault(ioc, []).append(value)
+    unique = list(submitted)
+
+    def generate():
+        matched, lines = 0, []
+        for ioc, match in lookup_index().match_many(unique):
+            matched += 1
+            lines.append(json.dumps(dict(describe_match(ioc, match), submitted=list(dict.fromkeys(submitted[ioc])))) + '\n')
+            if len(lines) == 1000:      # one write per thousand lines, not one per match
+                yield ''.join(lines)
+                lines = []
+        yield ''.join(lines) + json.dumps({'summary': {'received': len(values), 'unique': len(unique), 'matched': matched,
+                                      'took_ms': round((time.perf_counter() - started) * 1000, 1)}}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/ioc', defaults={'value': None})
+@app.route('/api/ioc/<path:value>')
+def api_ioc(value):
+    """Point lookup against the in-memory index; never fetches upstream"""
+    SCHEDULER.start()
+    # URLs survive intact as ?value=..., path segments get their slashes merged
+    value = request.args.get('value', value)
+    if not value:
+        return jsonify({'error': 'missing IOC value'}), 400
+    ioc = normalize_ioc(value)
+    match = lookup_index().match(ioc)
+    # Per-feed first/last seen from the store, including feeds that have since dropped it
+    try:
+        history = STORE.history(ioc) if STORE else {}
+    except sqlite3.Error:
+        # An unusable store is reported by the scheduler; lookups just go without history
+        history = {}
+    if not match:
+        body = {'ioc': ioc, 'found': False}
+        if history:
+            body['history'] = history
+        return jsonify(body), 404
+    body = describe_match(ioc, match)
+    if history:
+        body['history'] = history
+        body['first_seen'] = min([body['first_seen']] + [h['first_seen'] for h in history.values()])
+    return jsonify(body)
 
 if __name__ == '__main__':
+    if ROLE == 'fetcher':
+        print(f"\n🛰️  HUNTER'S GAZE FETCHER: publishing snapshots to {DATA_DIR}\n")
+        SCHEDULER.run()
+        sys.exit()
     print("\n🛡️  HUNTER'S GAZE XL-SOC ONLINE")
     print("👉 ACCESS: http://127.0.0.1:5000\n")
     app.run(host='0.0.0.0', port=5000, debug=True)